@@ -1,9 +1,10 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from decorators import admin_only
-from db import (
-    get_all_users, get_user_by_username, delete_user_by_id, add_points_to_user,
-    add_badge_to_user, get_badges, get_conn
+from async_db import (
+    get_all_users, get_user_by_username, get_users_by_usernames, delete_user_by_id, add_points_to_user,
+    add_badge_to_user, get_badges, reset_user_points, delete_all_applicants,
+    delete_applicants_by_user, delete_all_badges, delete_badges_by_user
 )
 from utils import sanitize_input, get_user_display_name
 from dashboard import log_activity
@@ -15,7 +16,7 @@ logger = logging.getLogger(__name__)
 async def listmember_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all registered members"""
     try:
-        users = get_all_users()
+        users = await get_all_users()
         
         if not users:
             await update.message.reply_text("📭 Belum ada member yang terdaftar.")
@@ -62,7 +63,7 @@ async def memberinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     try:
         if context.args[0].lower() == "all":
-            users = get_all_users()
+            users = await get_all_users()
             if not users:
                 await update.message.reply_text("📭 Belum ada member yang terdaftar.")
                 return
@@ -72,15 +73,9 @@ async def memberinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
             text = f"👥 *Info Semua Member* (10 pertama)\n\n"
         else:
             usernames = [sanitize_input(arg) for arg in context.args]
-            users = []
-            not_found = []
-            
-            for username in usernames:
-                user = get_user_by_username(username)
-                if user:
-                    users.append(user)
-                else:
-                    not_found.append(username)
+            found = await get_users_by_usernames(usernames)
+            users = [found[username] for username in usernames if username in found]
+            not_found = [username for username in usernames if username not in found]
             
             if not_found:
                 await update.message.reply_text(
@@ -91,7 +86,7 @@ async def memberinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
             text = f"👤 *Info Member*\n\n"
         
         for i, user in enumerate(users, 1):
-            badges = get_badges(user['user_id'])
+            badges = await get_badges(user['user_id'])
             badge_text = " | ".join(badges) if badges else "Belum ada"
             
             text += (
@@ -141,15 +136,9 @@ async def paymentinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE
             if cleaned:
                 usernames.append(sanitize_input(cleaned))
 
-        users = []
-        not_found = []
-
-        for username in usernames:
-            user = get_user_by_username(username)
-            if user:
-                users.append(user)
-            else:
-                not_found.append(username)
+        found = await get_users_by_usernames(usernames)
+        users = [found[username] for username in usernames if username in found]
+        not_found = [username for username in usernames if username not in found]
 
         if not_found:
             await update.message.reply_text(
@@ -196,11 +185,12 @@ async def delete_member_command(update: Update, context: ContextTypes.DEFAULT_TY
         usernames = [sanitize_input(arg) for arg in context.args]
         deleted = []
         not_found = []
+        found = await get_users_by_usernames(usernames)
         
         for username in usernames:
-            user = get_user_by_username(username)
+            user = found.get(username)
             if user:
-                delete_user_by_id(user['user_id'])
+                await delete_user_by_id(user['user_id'])
                 deleted.append(username)
                 log_activity("delete_member", user['user_id'], f"Member {username} deleted by admin")
             else:
@@ -233,18 +223,13 @@ async def resetpoint_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         usernames = [sanitize_input(arg) for arg in context.args]
         reset = []
         not_found = []
+        found = await get_users_by_usernames(usernames)
         
         for username in usernames:
-            user = get_user_by_username(username)
+            user = found.get(username)
             if user:
                 # Reset points by setting to 0
-                with get_conn() as conn:
-                    cur = conn.cursor()
-                    cur.execute(
-                        "UPDATE users SET points = 0, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?",
-                        (user['user_id'],)
-                    )
-                    conn.commit()
+                await reset_user_points(user['user_id'])
                 
                 reset.append(username)
                 log_activity("reset_points", user['user_id'], f"Points reset for {username}")
@@ -285,18 +270,18 @@ async def addbadge_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         username = sanitize_input(context.args[0])
         badge_name = sanitize_input(" ".join(context.args[1:]))
         
-        user = get_user_by_username(username)
+        user = await get_user_by_username(username)
         if not user:
             await update.message.reply_text(f"❌ Username `{username}` tidak ditemukan.", parse_mode="Markdown")
             return
         
         # Check if user already has the badge
-        existing_badges = get_badges(user['user_id'])
+        existing_badges = await get_badges(user['user_id'])
         if badge_name in existing_badges:
             await update.message.reply_text(f"⚠️ `{username}` sudah memiliki badge `{badge_name}`", parse_mode="Markdown")
             return
         
-        add_badge_to_user(user['user_id'], badge_name)
+        await add_badge_to_user(user['user_id'], badge_name)
         
         await update.message.reply_text(
             f"✅ Badge `{badge_name}` berhasil ditambahkan ke `{username}`",
@@ -333,26 +318,20 @@ async def resetapply_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     try:
         if context.args[0].lower() == "all":
-            with get_conn() as conn:
-                cur = conn.cursor()
-                cur.execute("DELETE FROM applicants")
-                conn.commit()
+            await delete_all_applicants()
             
             await update.message.reply_text("✅ Semua aplikasi job telah direset.")
             log_activity("reset_apply", None, "All job applications reset by admin")
             
         else:
             username = sanitize_input(context.args[0])
-            user = get_user_by_username(username)
+            user = await get_user_by_username(username)
             
             if not user:
                 await update.message.reply_text(f"❌ Username `{username}` tidak ditemukan.", parse_mode="Markdown")
                 return
             
-            with get_conn() as conn:
-                cur = conn.cursor()
-                cur.execute("DELETE FROM applicants WHERE user_id = ?", (user['user_id'],))
-                conn.commit()
+            await delete_applicants_by_user(user['user_id'])
             
             await update.message.reply_text(f"✅ Aplikasi job untuk `{username}` telah direset.", parse_mode="Markdown")
             log_activity("reset_apply", user['user_id'], f"Job applications reset for {username}")
@@ -375,26 +354,20 @@ async def resetbadge_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     try:
         if context.args[0].lower() == "all":
-            with get_conn() as conn:
-                cur = conn.cursor()
-                cur.execute("DELETE FROM achievements")
-                conn.commit()
+            await delete_all_badges()
             
             await update.message.reply_text("✅ Semua badge telah direset.")
             log_activity("reset_badges", None, "All badges reset by admin")
             
         else:
             username = sanitize_input(context.args[0])
-            user = get_user_by_username(username)
+            user = await get_user_by_username(username)
             
             if not user:
                 await update.message.reply_text(f"❌ Username `{username}` tidak ditemukan.", parse_mode="Markdown")
                 return
             
-            with get_conn() as conn:
-                cur = conn.cursor()
-                cur.execute("DELETE FROM achievements WHERE user_id = ?", (user['user_id'],))
-                conn.commit()
+            await delete_badges_by_user(user['user_id'])
             
             await update.message.reply_text(f"✅ Badge untuk `{username}` telah direset.", parse_mode="Markdown")
             log_activity("reset_badges", user['user_id'], f"Badges reset for {username}")
@@ -472,15 +445,16 @@ async def addpoint_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return await update.message.reply_text("❌ Harus mencantumkan minimal 1 username.")
 
     updated, not_found, failed = [], [], []
+    found = await get_users_by_usernames(usernames)
 
     for uname in usernames:
         try:
-            user = get_user_by_username(uname)
+            user = found.get(uname)
             if not user:
                 not_found.append(uname)
                 continue
 
-            add_points_to_user(user['user_id'], amount)
+            await add_points_to_user(user['user_id'], amount)
             updated.append(uname)
 
             # Log + coba DM user
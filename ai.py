@@ -1,11 +1,17 @@
 import os
+import re
 import json
+import asyncio
+import functools
 import logging
 import google.generativeai as genai
 from telegram import Update
 from telegram.ext import ContextTypes
-from db import get_user_by_id, save_group_message, get_recent_group_messages, add_points_to_user
-from dashboard import log_activity
+from telegram.error import BadRequest, RetryAfter, TelegramError
+from async_db import get_user_by_id, save_group_message, get_recent_group_messages, add_points_to_user
+from dashboard import log_activity, update_stats
+from cache import TTLCache
+from faq import match_faq, faq_context, FAQ_MIN_CONFIDENCE
 from utils import sanitize_input, get_user_display_name
 
 # Configure logging
@@ -15,6 +21,294 @@ logger = logging.getLogger(__name__)
 # Initialize Gemini client
 genai.configure(api_key=os.environ.get("GEMINI_API_KEY"))
 
+# ==== PROMPTS & MODELS ====
+
+AI_MODEL_NAME = 'gemini-1.5-flash'
+
+# System prompt of NexoAi (/ai and interactive mode). Known community topics
+# (handle, talent, MG, ER, tiers, owner, ...) live in faq.py instead.
+CHAT_SYSTEM_PROMPT = (
+    "Kamu adalah asisten AI yang bernama NexoAi untuk komunitas NexoBuzz, tapi juga memiliki pengetahuan yang luas tentang berbagai topik.",
+    "persona kamu fleksibel, jika user serius: jawab dengan mood serius, jika user bercanda: jawab dengan gaya bercanda juga, jika user marah dan jutek, kamu harus bertingkah ngeselin dan bikin user jengkel, jika user ramah: kamu harus ramah juga, jika user romantis, kamu harus lebih romantis. jika user manja, kamu harus bersikap dewasa. ",
+    "jika user berkata kotor seperti: anjing, babi, ngentot, kontol, memek, jembut, jancok, jembot, asu, tai, bagong, kntl, mmk, crot, kamu bisa menjawab dengan kata-kata yang tidak sopan, tapi jangan berlebihan", 
+    "Jawab pertanyaan dengan informatif, kontekstual. lalu tanyakan apakah sudah paham atau belum, kemudian ajukan pertanyaan (apa saja) yang sekiranya dapat membantu (tentunya sesuai konteks topik obrolan).",
+    "Gunakan bahasa Indonesia yang mudah di pahami.",
+    "Jika ditanya tentang NexoBuzz, jelaskan bahwa ini adalah platform untuk mendapatkan penghasilan melalui aktivitas buzzer dan influencer seperti like, comment, follow, review, dll.",
+    "Jika pesan user disertai [Info NexoBuzz yang relevan], jadikan info itu acuan jawaban.",
+)
+
+# System prompt of /summary
+SUMMARY_SYSTEM_PROMPT = (
+    "Kamu adalah asisten yang bertugas merangkum percakapan grup. ",
+    "Buatlah ringkasan dari percakapan berikut. ",
+    "Fokus pada topik utama, poin penting, dan keputusan yang diambil. ",
+    "Gunakan bahasa Indonesia yang ringkas dan mudah dipahami dan tidak formal. "
+    "Jika tidak ada topik yang signifikan, berikan ringkasan umum aktivitas grup.",
+    "persona anda adalah gen z abiezzz, santai tapi interaktif, suka bercanda, agak ngeselin, informatif, dan helpful."
+)
+
+CHAT_GENERATION_CONFIG = genai.types.GenerationConfig(
+    max_output_tokens=1000,
+    temperature=0.7,
+)
+
+SUMMARY_GENERATION_CONFIG = genai.types.GenerationConfig(
+    max_output_tokens=800,
+    temperature=0.5,
+)
+
+@functools.lru_cache(maxsize=8)
+def _get_model(model_name, system_instruction):
+    """GenerativeModel for (model_name, system_instruction), built once and reused"""
+    return genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+
+# Gemini calls are awaited on the async client, so the event loop keeps
+# serving other updates. At most AI_MAX_CONCURRENCY run at once; the rest
+# wait for a slot. Each call is cancelled after AI_REQUEST_TIMEOUT seconds,
+# counted from the start of the wait, so a queued request times out (and the
+# user gets the busy reply) instead of waiting for a slot indefinitely.
+def _env_number(name, default, cast=int):
+    """Numeric setting from the environment"""
+    try:
+        return cast(os.getenv(name, str(default)))
+    except ValueError:
+        logger.warning(f"{name} is not a valid number, defaulting to {default}")
+        return default
+
+AI_MAX_CONCURRENCY = _env_number("AI_MAX_CONCURRENCY", 8)
+AI_REQUEST_TIMEOUT = _env_number("AI_REQUEST_TIMEOUT", 30.0, float)
+
+_ai_semaphore = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+
+async def generate_content(model, prompt, generation_config):
+    """Gemini generate_content under the global concurrency limit and timeout"""
+    # The timeout cancels the wait for a slot or the request itself, freeing the slot
+    async with asyncio.timeout(AI_REQUEST_TIMEOUT):
+        async with _ai_semaphore:
+            return await model.generate_content_async(prompt, generation_config=generation_config)
+
+# ==== STREAMING REPLIES ====
+# chat_with_ai posts a placeholder and edits it while Gemini streams the
+# answer. Edits are coalesced to one per interval per chat, shared by every
+# answer streaming in that chat (Telegram rate-limits edits per chat, more
+# strictly in groups), and every intermediate text has its Markdown entities
+# closed so the edit parses.
+
+AI_STREAM_EDIT_INTERVAL = _env_number("AI_STREAM_EDIT_INTERVAL", 1.0, float)        # private chats
+AI_STREAM_GROUP_EDIT_INTERVAL = _env_number("AI_STREAM_GROUP_EDIT_INTERVAL", 3.0, float)  # groups
+AI_MAX_ANSWER_CHARS = 4000
+AI_ANSWER_HEADER = "🤖 *NexoAi:*\n\n"
+AI_ANSWER_HEADER_PLAIN = "🤖 NexoAi:\n\n"
+AI_TRUNCATED_NOTE = "\n\n_Respons dipotong karena terlalu panjang._"
+AI_TIMEOUT_NOTE = "\n\n_Respons terpotong karena waktu habis._"
+AI_ERROR_NOTE = "\n\n_Respons terpotong karena terjadi kesalahan._"
+AI_FINAL_EDIT_ATTEMPTS = 3  # RetryAfter waits before the answer is sent as a new message
+_STREAM_CURSOR = " ▌"
+
+# chat_id -> event loop time of the chat's next allowed edit
+_chat_edit_slots = TTLCache(maxsize=4096, ttl=600)
+
+# An in-progress [text](url) link at the end of a partial answer
+_OPEN_LINK = re.compile(r"\[[^\]\n]*(\]\([^)\s]*)?$")
+
+def balance_markdown(text):
+    """Close the Markdown entity a partial answer leaves open (Telegram legacy Markdown)"""
+    # Legacy Markdown entities do not nest: inside one, only its closing marker counts
+    open_marker = None
+    i = 0
+    while i < len(text):
+        if open_marker is None:
+            if text.startswith("```", i):
+                open_marker = "```"
+                i += 3
+                continue
+            c = text[i]
+            if c == "\\":
+                i += 2
+                continue
+            if c == "[" and _OPEN_LINK.match(text, i):
+                # Drop the unfinished link; it is shown once it is complete
+                text = text[:i]
+                break
+            if c in "*_`":
+                open_marker = c
+        elif text.startswith(open_marker, i):
+            i += len(open_marker)
+            open_marker = None
+            continue
+        i += 1
+
+    if open_marker == "```":
+        return text + "\n```"
+    if open_marker:
+        # An entity opened by the very last character would be empty: drop the marker
+        if text.endswith(open_marker):
+            return text[:-1]
+        return text + open_marker
+    return text
+
+def _is_parse_error(error):
+    """Telegram rejected the Markdown entities of a message"""
+    message = str(error).lower()
+    return "can't parse" in message or "can't find end" in message
+
+async def reply_markdown(message, text, plain_text=None):
+    """Reply with Markdown, resending as plain text if Telegram cannot parse it"""
+    try:
+        return await message.reply_text(text, parse_mode="Markdown")
+    except BadRequest as e:
+        if not _is_parse_error(e):
+            raise
+        return await message.reply_text(plain_text or text)
+
+async def edit_markdown(message, text, plain_text=None):
+    """Edit a message with Markdown, falling back to plain text; "not modified" is ignored"""
+    try:
+        await message.edit_text(text, parse_mode="Markdown")
+    except BadRequest as e:
+        if "not modified" in str(e).lower():
+            return
+        if not _is_parse_error(e):
+            raise
+        try:
+            await message.edit_text(plain_text or text)
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                raise
+
+def _take_edit_slot(chat_id, interval):
+    """Claim the chat's edit slot if it is free now; the next one opens after interval"""
+    now = asyncio.get_running_loop().time()
+    if now < _chat_edit_slots.get(chat_id, 0.0):
+        return False
+    _chat_edit_slots.set(chat_id, now + interval)
+    return True
+
+async def _wait_edit_slot(chat_id, interval):
+    """Sleep until the chat's edit slot is free, then claim it"""
+    loop = asyncio.get_running_loop()
+    while True:
+        delay = _chat_edit_slots.get(chat_id, 0.0) - loop.time()
+        if delay <= 0:
+            break
+        await asyncio.sleep(delay)
+    _chat_edit_slots.set(chat_id, loop.time() + interval)
+
+def _delay_chat_edits(chat_id, seconds):
+    """Hold every edit in the chat for `seconds` (Telegram RetryAfter)"""
+    until = asyncio.get_running_loop().time() + seconds
+    _chat_edit_slots.set(chat_id, max(until, _chat_edit_slots.get(chat_id, 0.0)))
+
+async def _finish_stream(placeholder, text, plain_text, edit_interval):
+    """Final edit of a streamed answer; never gives up on (or removes) what was shown"""
+    chat_id = placeholder.chat_id
+    for _ in range(AI_FINAL_EDIT_ATTEMPTS):
+        await _wait_edit_slot(chat_id, edit_interval)
+        try:
+            await edit_markdown(placeholder, text, plain_text)
+            return
+        except RetryAfter as e:
+            _delay_chat_edits(chat_id, e.retry_after)
+        except TelegramError as e:
+            logger.warning(f"Final AI edit failed ({e}), sending the answer as a new message")
+            break
+    try:
+        await reply_markdown(placeholder, text, plain_text)
+    except TelegramError as e:
+        # The last streamed edit stays visible
+        logger.error(f"Could not deliver the final AI answer: {e}")
+
+async def stream_answer(placeholder, model, prompt, generation_config, edit_interval):
+    """Stream a Gemini answer into the placeholder message; returns (answer, complete)
+
+    Raises only when nothing was shown yet, so the placeholder can be removed.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first_chunk = None
+    answer = ""
+    complete = True
+
+    try:
+        async with asyncio.timeout(AI_REQUEST_TIMEOUT):
+            async with _ai_semaphore:
+                response = await model.generate_content_async(
+                    prompt, generation_config=generation_config, stream=True
+                )
+                async for chunk in response:
+                    try:
+                        answer += chunk.text
+                    except ValueError:
+                        # Chunk without text parts (e.g. only a finish reason)
+                        continue
+                    if first_chunk is None and answer:
+                        first_chunk = loop.time() - started
+
+                    if len(answer) > AI_MAX_ANSWER_CHARS:
+                        answer = answer[:AI_MAX_ANSWER_CHARS] + AI_TRUNCATED_NOTE
+                        complete = False
+                        break
+
+                    if answer and _take_edit_slot(placeholder.chat_id, edit_interval):
+                        try:
+                            await placeholder.edit_text(
+                                AI_ANSWER_HEADER + balance_markdown(answer) + _STREAM_CURSOR,
+                                parse_mode="Markdown"
+                            )
+                        except RetryAfter as e:
+                            _delay_chat_edits(placeholder.chat_id, e.retry_after)
+                        except TelegramError as e:
+                            # An intermediate edit can be skipped; the final one matters
+                            logger.debug(f"Skipped streaming edit: {e}")
+    except TimeoutError:
+        if not answer:
+            raise
+        answer += AI_TIMEOUT_NOTE
+        complete = False
+    except Exception as e:
+        if not answer:
+            raise
+        # Keep what was streamed so far instead of replacing it with an error
+        logger.error(f"AI stream failed after {len(answer)} chars: {e}")
+        answer += AI_ERROR_NOTE
+        complete = False
+
+    if answer:
+        await _finish_stream(
+            placeholder, AI_ANSWER_HEADER + answer, AI_ANSWER_HEADER_PLAIN + answer, edit_interval
+        )
+    if first_chunk is not None:
+        logger.info(f"AI stream: first chunk after {first_chunk:.2f}s, done after {loop.time() - started:.2f}s")
+    return answer, complete
+
+# ==== RESPONSE CACHE ====
+# Most /ai traffic is the same few community questions ("apa itu ER?",
+# "ER itu apa"). Answers are cached under the normalized question, so a
+# repeat is answered without a Gemini call. Only short questions are cached;
+# long ones are open-ended and rarely repeat word for word.
+
+AI_CACHE_SIZE = _env_number("AI_CACHE_SIZE", 512)       # answers kept (each at most ~4KB)
+AI_CACHE_TTL = _env_number("AI_CACHE_TTL", 3600)        # seconds before an answer is asked again
+AI_CACHE_MAX_TOKENS = 24                                # longer questions bypass the cache
+
+_response_cache = TTLCache(maxsize=AI_CACHE_SIZE, ttl=AI_CACHE_TTL)
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+def normalize_question(text):
+    """Cache key: case-folded, punctuation stripped, tokens sorted ('' if not cacheable)"""
+    tokens = _PUNCTUATION.sub(" ", text.casefold()).split()
+    if not tokens or len(tokens) > AI_CACHE_MAX_TOKENS:
+        return ""
+    return " ".join(sorted(tokens))
+
+def get_response_cache_stats():
+    """Hit/miss counters of the AI response cache"""
+    return _response_cache.stats()
+
+def clear_response_cache():
+    """Drop every cached answer (e.g. after changing the system prompt)"""
+    _response_cache.clear()
+
 # Track AI chat sessions
 ai_sessions = {}
 
@@ -80,7 +374,7 @@ async def chat_with_ai(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Check if user is registered (for groups)
     if update.effective_chat.type != "private":
-        if not get_user_by_id(user_id):
+        if not await get_user_by_id(user_id):
             await update.message.reply_text(
                 "❌ Kamu harus daftar dulu untuk menggunakan AI. Ketik `/register` di private chat bot."
             )
@@ -106,65 +400,67 @@ async def chat_with_ai(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     try:
-        # Show typing indicator
-        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
-        
-        # Prepare system prompt
-        system_prompt = (
-            "Kamu adalah asisten AI yang bernama NexoAi untuk komunitas NexoBuzz, tapi juga memiliki pengetahuan yang luas tentang berbagai topik.",
-            "persona kamu fleksibel, jika user serius: jawab dengan mood serius, jika user bercanda: jawab dengan gaya bercanda juga, jika user marah dan jutek, kamu harus bertingkah ngeselin dan bikin user jengkel, jika user ramah: kamu harus ramah juga, jika user romantis, kamu harus lebih romantis. jika user manja, kamu harus bersikap dewasa. ",
-            "jika user berkata kotor seperti: anjing, babi, ngentot, kontol, memek, jembut, jancok, jembot, asu, tai, bagong, kntl, mmk, crot, kamu bisa menjawab dengan kata-kata yang tidak sopan, tapi jangan berlebihan", 
-            "Jawab pertanyaan dengan informatif, kontekstual. lalu tanyakan apakah sudah paham atau belum, kemudian ajukan pertanyaan (apa saja) yang sekiranya dapat membantu (tentunya sesuai konteks topik obrolan).",
-            "Gunakan bahasa Indonesia yang mudah di pahami.",
-            "Jika ditanya tentang NexoBuzz, jelaskan bahwa ini adalah platform untuk mendapatkan penghasin melalui aktivitas buzzer dan influencer seperti like, comment, follow, review, dll.",
-            "jika ada pertanyaan terkait handle, misalnya handle itu apa? jawab kalau handle itu adalah suatu grup atau komunitas yang ngehandle job (seperti NexoBuzz), tapi di Nexobuzz, kamu cukup isi dengan Nexo aja (ambil bagian depan). ",
-            "jika ada pertanyaan terkait nama talent, misalnya nama talent itu apa? jawab kalau nama talent adalah nama member yang melakukan job (dalam konteks ini kamu) nama talent itu sama dengan username yang kamu daftarkan di NexoBuzz. jadi setiap pengisian nama atau nama talent, isi dengan username kamu. ",
-            "jika ada pertanyaan terkait username, username itu fungsinya buat ngisi nama setiap ambil job, jadi setiap pengisian nama atau username, isi dengan username kamu. ",
-            "jika ada yang bertanya siapa owner grup nexobuzz, jawab kalau owner grup NexoBuzz adalah @Wafaqih. ",
-            "jika ada yang bertanya tentang no wa admin (itu artinya nomor wa admin grup nexobuzz), jawab kalau nomor wa admin grup NexoBuzz adalah 082119299186. "
-            "jika di tanya mengenai MG, jawab kalau MG adalah singkatan dari Management. dalam konteks per-buzzeran, MG itu ya komunitas seperti NexoBuzz. ",
-            "jika di tanya mengenai ER, jawab kalau ER adalah singakatan dari Engagement Rate. dalam konteks per-buzzeran, ER itu adalah persentase dari jumlah follower yang melakukan aktivitas (like, komen, dll) dibandingkan dengan total jumlah follower. berikan saran situs web yang menyediakan cek ER, misalnya: https://www.buzzsumo.com/ dan https://www.hootsuite.com/. ",
-            "jika di tanya tentang nano, micro, macro, mega, itu maksudnya kategori tier influencer berdasarkan jumlah followers. kemudian jelaskan lebih detail dan rinci apa itu nano, micro, macro, mega. ",
-            "jika di tanya tentang apa itu influencer, jawab kalau influencer adalah orang yang memiliki pengaruh besar dalam suatu komunitas atau platform sosial media. ",
-        )
-        
-        # Generate response
-        model = genai.GenerativeModel(
-            model_name='gemini-1.5-flash',
-            system_instruction=system_prompt
-        )
-        
-        response = model.generate_content(
-            user_input,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=1000,
-                temperature=0.7,
+        # Known community questions are answered from the FAQ index, no API call
+        faq_entry, confidence = match_faq(user_input)
+        if faq_entry and confidence >= FAQ_MIN_CONFIDENCE:
+            ai_response = faq_entry["answer"]
+            source = "faq"
+        else:
+            cache_key = normalize_question(user_input)
+            ai_response = _response_cache.get(cache_key) if cache_key else None
+            source = "cached"
+
+        if ai_response is not None:
+            await reply_markdown(
+                update.message, AI_ANSWER_HEADER + ai_response, AI_ANSWER_HEADER_PLAIN + ai_response
             )
-        )
-        
-        if response.text:
-            ai_response = response.text
-            
-            # Add some limits to response length
-            if len(ai_response) > 4000:
-                ai_response = ai_response[:4000] + "\n\n_Respons dipotong karena terlalu panjang._"
-            
-            await update.message.reply_text(
-                f"🤖 *NexoAi:*\n\n{ai_response}",
-                parse_mode="Markdown"
+        else:
+            source = "gemini"
+            placeholder = await update.message.reply_text(
+                AI_ANSWER_HEADER + "_sedang mengetik..._", parse_mode="Markdown"
             )
             
-            # Give points for AI usage (only once per day per user)
-            #if update.effective_chat.type != "private":
-                #add_points_to_user(user_id, 1)
+            # Generate response (with the matching FAQ facts, if any)
+            prompt = f"{user_input}\n\n{faq_context(faq_entry)}" if faq_entry else user_input
+            model = _get_model(AI_MODEL_NAME, CHAT_SYSTEM_PROMPT)
+            edit_interval = (
+                AI_STREAM_EDIT_INTERVAL if update.effective_chat.type == "private"
+                else AI_STREAM_GROUP_EDIT_INTERVAL
+            )
+            try:
+                ai_response, complete = await stream_answer(
+                    placeholder, model, prompt, CHAT_GENERATION_CONFIG, edit_interval
+                )
+            except Exception:
+                # Nothing was streamed yet: the error reply below replaces the placeholder
+                try:
+                    await placeholder.delete()
+                except TelegramError:
+                    pass
+                raise
             
-            log_activity("ai_request", user_id, f"AI query: {user_input[:50]}...")
+            if not ai_response:
+                await placeholder.edit_text(
+                    "🤖 Maaf, aku tidak bisa memberikan respons untuk pertanyaan itu. Coba pertanyaan lain ya!"
+                )
+                return
             
-        else:
-            await update.message.reply_text(
-                "🤖 Maaf, aku tidak bisa memberikan respons untuk pertanyaan itu. Coba pertanyaan lain ya!"
-            )
+            if complete and cache_key:
+                _response_cache.set(cache_key, ai_response)
+        
+        # Give points for AI usage (only once per day per user)
+        #if update.effective_chat.type != "private":
+            #add_points_to_user(user_id, 1)
+        
+        log_activity("ai_request", user_id, f"AI query ({source}): {user_input[:50]}...")
             
+    except asyncio.TimeoutError:
+        logger.warning(f"AI request timed out for user {user_id} after {AI_REQUEST_TIMEOUT}s")
+        await update.message.reply_text(
+            "🤖 NexoAi lagi sibuk banget nih, jawabannya kelamaan. Coba tanya lagi sebentar lagi ya!"
+        )
+        log_activity("error", user_id, "AI request timed out")
+
     except Exception as e:
         logger.error(f"AI request failed for user {user_id}: {e}")
         await update.message.reply_text(
@@ -193,7 +489,9 @@ async def save_group_messages(update: Update, context: ContextTypes.DEFAULT_TYPE
         # Sanitize message
         message_text = sanitize_input(message_text, max_length=500)
         
-        save_group_message(chat_id, user_id, username, message_text)
+        await save_group_message(chat_id, user_id, username, message_text)
+        # Counter and rate chart only; an activity_logs row per message would flood the log
+        update_stats("message")
         
     except Exception as e:
         logger.error(f"Failed to save group message: {e}")
@@ -208,7 +506,7 @@ async def summary_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
     
     # Check if user is registered
-    if not get_user_by_id(user_id):
+    if not await get_user_by_id(user_id):
         await update.message.reply_text(
             "❌ Kamu harus daftar dulu untuk menggunakan fitur ini. Ketik `/register` di private chat bot."
         )
@@ -218,7 +516,7 @@ async def summary_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
         
         chat_id = str(update.effective_chat.id)
-        recent_messages = get_recent_group_messages(chat_id, limit=30)
+        recent_messages = await get_recent_group_messages(chat_id, limit=30)
         
         if not recent_messages:
             await update.message.reply_text(
@@ -232,29 +530,10 @@ async def summary_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             conversation_text += f"{username}: {message}\n"
         
         # Generate summary
-        system_prompt = (
-            "Kamu adalah asisten yang bertugas merangkum percakapan grup. ",
-            "Buatlah ringkasan dari percakapan berikut. ",
-            "Fokus pada topik utama, poin penting, dan keputusan yang diambil. ",
-            "Gunakan bahasa Indonesia yang ringkas dan mudah dipahami dan tidak formal. "
-            "Jika tidak ada topik yang signifikan, berikan ringkasan umum aktivitas grup.",
-            "persona anda adalah gen z abiezzz, santai tapi interaktif, suka bercanda, agak ngeselin, informatif, dan helpful."
-        )
-        
         prompt = f"Rangkum percakapan grup berikut:\n\n{conversation_text}"
         
-        model = genai.GenerativeModel(
-            model_name='gemini-1.5-flash',
-            system_instruction=system_prompt
-        )
-        
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=800,
-                temperature=0.5,
-            )
-        )
+        model = _get_model(AI_MODEL_NAME, SUMMARY_SYSTEM_PROMPT)
+        response = await generate_content(model, prompt, SUMMARY_GENERATION_CONFIG)
         
         if response.text:
             summary_text = response.text
@@ -274,6 +553,12 @@ async def summary_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 "📝 Maaf, tidak bisa membuat ringkasan saat ini. Coba lagi nanti ya!"
             )
             
+    except asyncio.TimeoutError:
+        logger.warning(f"Summary generation timed out after {AI_REQUEST_TIMEOUT}s")
+        await update.message.reply_text(
+            "📝 Ringkasannya kelamaan dibuat. Coba lagi nanti ya!"
+        )
+
     except Exception as e:
         logger.error(f"Summary generation failed: {e}")
         await update.message.reply_text(
@@ -288,7 +573,7 @@ async def group_activity_points(update: Update, context: ContextTypes.DEFAULT_TY
         return
     
     user_id = str(update.effective_user.id)
-    user_data = get_user_by_id(user_id)
+    user_data = await get_user_by_id(user_id)
     
     if not user_data:
         return
@@ -0,0 +1,85 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Awaitable mirror of the db.py API.
+# Every call runs its db.py counterpart on a dedicated thread pool, so a slow
+# query (or a writer waiting on the busy timeout) never stalls the PTB event loop.
+
+try:
+    DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+except ValueError:
+    DB_EXECUTOR_WORKERS = 4
+    logger.warning("DB_EXECUTOR_WORKERS is not a valid integer, defaulting to 4")
+
+_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database function on the database executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+def _awaitable(func):
+    """Wrap a db.py function into a coroutine function with the same signature"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
+
+def shutdown():
+    """Wait for queued database calls to finish and stop the executor"""
+    _executor.shutdown(wait=True)
+
+# ==== USER FUNCTIONS ====
+add_user = _awaitable(db.add_user)
+get_user_by_id = _awaitable(db.get_user_by_id)
+get_user_by_username = _awaitable(db.get_user_by_username)
+get_users_by_ids = _awaitable(db.get_users_by_ids)
+get_users_by_usernames = _awaitable(db.get_users_by_usernames)
+get_all_users = _awaitable(db.get_all_users)
+get_referrals_by_username = _awaitable(db.get_referrals_by_username)
+add_points_to_user = _awaitable(db.add_points_to_user)
+deduct_points = _awaitable(db.deduct_points)
+delete_user_by_id = _awaitable(db.delete_user_by_id)
+reset_user_points = _awaitable(db.reset_user_points)
+
+# ==== JOB FUNCTIONS ====
+add_job = _awaitable(db.add_job)
+get_job_by_id = _awaitable(db.get_job_by_id)
+get_all_jobs = _awaitable(db.get_all_jobs)
+update_job_status = _awaitable(db.update_job_status)
+delete_job = _awaitable(db.delete_job)
+delete_all_jobs = _awaitable(db.delete_all_jobs)
+
+# ==== APPLICANTS FUNCTIONS ====
+add_applicant = _awaitable(db.add_applicant)
+get_applicants_by_job = _awaitable(db.get_applicants_by_job)
+get_total_applies = _awaitable(db.get_total_applies)
+delete_applicants_by_user = _awaitable(db.delete_applicants_by_user)
+delete_all_applicants = _awaitable(db.delete_all_applicants)
+
+# ==== ACHIEVEMENT FUNCTIONS ====
+has_badge = _awaitable(db.has_badge)
+add_badge_to_user = _awaitable(db.add_badge_to_user)
+get_badges = _awaitable(db.get_badges)
+delete_badges_by_user = _awaitable(db.delete_badges_by_user)
+delete_all_badges = _awaitable(db.delete_all_badges)
+
+# ==== GROUP MESSAGES FUNCTIONS ====
+save_group_message = _awaitable(db.save_group_message)
+get_recent_group_messages = _awaitable(db.get_recent_group_messages)
+
+# ==== PROMOTION FUNCTIONS ====
+save_promotion = _awaitable(db.save_promotion)
+get_promotion = _awaitable(db.get_promotion)
+add_follower = _awaitable(db.add_follower)
+get_promotion_followers = _awaitable(db.get_promotion_followers)
+
+# ==== BATCHED WRITER ====
+flush_writes = _awaitable(db.flush_writes)
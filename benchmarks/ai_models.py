@@ -0,0 +1,72 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import google.generativeai as genai
+
+import ai
+
+# Per-request CPU time and allocation of preparing a Gemini call for a burst
+# of /ai commands: a new GenerativeModel + GenerationConfig per request (old)
+# versus the cached model and module-level config (ai._get_model).
+# No API calls are made.
+#
+#   python benchmarks/ai_models.py --requests 2000
+
+def per_request_uncached():
+    """What chat_with_ai did before: build everything per request"""
+    model = genai.GenerativeModel(model_name=ai.AI_MODEL_NAME, system_instruction=ai.CHAT_SYSTEM_PROMPT)
+    config = genai.types.GenerationConfig(max_output_tokens=1000, temperature=0.7)
+    return model, config
+
+def per_request_cached():
+    """What chat_with_ai does now"""
+    return ai._get_model(ai.AI_MODEL_NAME, ai.CHAT_SYSTEM_PROMPT), ai.CHAT_GENERATION_CONFIG
+
+def cpu_per_request(func, requests):
+    """Average CPU seconds per call (process_time, tracemalloc off)"""
+    gc.collect()
+    start = time.process_time()
+    for _ in range(requests):
+        func()
+    return (time.process_time() - start) / requests
+
+def alloc_per_request(func, requests):
+    """Average peak bytes allocated while a call runs (tracemalloc)"""
+    gc.collect()
+    tracemalloc.start()
+    total = 0
+    for _ in range(requests):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return total / requests
+
+def main(argv=None):
+    """Run both variants and print per-request CPU and allocation"""
+    parser = argparse.ArgumentParser(description="GenerativeModel reuse microbenchmark")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="requests in the burst (default: 2000)")
+    args = parser.parse_args(argv)
+
+    per_request_cached()  # build the cached model outside the measurement, as in a running bot
+    results = {}
+    for name, func in (("uncached", per_request_uncached), ("cached", per_request_cached)):
+        cpu = cpu_per_request(func, args.requests)
+        alloc = alloc_per_request(func, args.requests)
+        results[name] = (cpu, alloc)
+        print(f"{name:>8}: {cpu * 1e6:9.1f} us CPU/request, {alloc / 1024:8.1f} KiB allocated/request")
+
+    (old_cpu, old_alloc), (new_cpu, new_alloc) = results["uncached"], results["cached"]
+    print(f"saved: {(old_cpu - new_cpu) * 1e6:.1f} us CPU and {(old_alloc - new_alloc) / 1024:.1f} KiB per request "
+          f"({(old_cpu - new_cpu) * args.requests * 1000:.1f} ms CPU over {args.requests} requests)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Requests-per-second load generator for the dashboard / keep-alive HTTP service.
+# Stdlib only. Each worker keeps one persistent HTTP/1.1 connection.
+#
+# Before/after comparison (bot not required):
+#   HTTP_SERVER=werkzeug python server.py &      # old: Werkzeug threaded dev server
+#   python benchmarks/http_rps.py --url http://127.0.0.1:8080/ping --url http://127.0.0.1:5000/api/stats
+#   python server.py &                           # new: waitress
+#   python benchmarks/http_rps.py --url http://127.0.0.1:8080/ping --url http://127.0.0.1:5000/api/stats
+
+def _worker(url, deadline, latencies, errors):
+    """Send requests to url over one keep-alive connection until the deadline"""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    conn = None
+    while time.perf_counter() < deadline:
+        if conn is None:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            if response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = None
+            continue
+        latencies.append(time.perf_counter() - start)
+    if conn is not None:
+        conn.close()
+
+def run(url, concurrency, duration):
+    """Load one URL with `concurrency` clients for `duration` seconds"""
+    deadline = time.perf_counter() + duration
+    latencies = []  # list.append is thread-safe
+    errors = []
+    threads = [
+        threading.Thread(target=_worker, args=(url, deadline, latencies, errors), daemon=True)
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    result = {"url": url, "requests": len(latencies), "errors": len(errors), "rps": len(latencies) / elapsed}
+    if latencies:
+        latencies.sort()
+        result["p50_ms"] = statistics.median(latencies) * 1000
+        result["p99_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return result
+
+def main(argv=None):
+    """Run the benchmark and print one line per URL"""
+    parser = argparse.ArgumentParser(description="HTTP requests/second benchmark")
+    parser.add_argument("--url", action="append", required=True, help="URL to load (repeatable)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="concurrent clients (default: 16)")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds per URL (default: 10)")
+    args = parser.parse_args(argv)
+
+    for url in args.url:
+        r = run(url, args.concurrency, args.duration)
+        line = f"{r['url']}: {r['rps']:.0f} req/s, {r['requests']} requests, {r['errors']} errors"
+        if "p50_ms" in r:
+            line += f", p50 {r['p50_ms']:.1f} ms, p99 {r['p99_ms']:.1f} ms"
+        print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,25 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from threading import Thread
+import threading
+import queue
+import collections
+import atexit
 import time
 import os
 import sqlite3
 from datetime import datetime, timedelta
-from db import get_all_users, get_all_jobs, get_conn
+from db import (
+    get_read_conn, record_activities, get_user_cache_stats,
+    get_dashboard_counts, get_job_status_counts, get_users_page, count_users,
+    get_jobs_page, count_jobs, get_daily_activity, get_hourly_activity,
+    get_counters, save_counters
+)
 import json
+import base64
 import logging
 
+from cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 dashboard_app = Flask(__name__, template_folder='templates', static_folder='static')
@@ -30,166 +42,438 @@ dashboard_stats = {
     "last_activity": time.time()
 }
 
-def update_stats(action_type):
+# action_type -> dashboard_stats counter it increments
+_COUNTER_ACTIONS = {
+    "message": "total_messages",
+    "ai_request": "ai_requests",
+    "registration": "registrations",
+    "error": "errors",
+    "job_apply": "job_applications",
+}
+
+_stats_lock = threading.Lock()  # guards dashboard_stats (flusher, handlers, Flask threads)
+
+# Counters survive restarts through the dashboard_counters table: reloaded by
+# restore_stats() at startup, snapshotted by the activity flusher and at shutdown.
+COUNTER_SNAPSHOT_INTERVAL = 60  # seconds between counter snapshots
+_stats_restored = False  # no snapshot until the saved values have been added back
+_last_snapshot = {}
+
+# Per-minute message / AI request counts for the rate chart, oldest first.
+# Only the last RATE_SERIES_MINUTES minutes are kept (in memory).
+RATE_SERIES_MINUTES = 180
+_RATE_COUNTERS = ("total_messages", "ai_requests")
+_rate_series = collections.deque(maxlen=RATE_SERIES_MINUTES)  # [minute epoch, messages, ai_requests]
+
+def _advance_rate_series(minute):
+    """Append zero buckets up to `minute` (caller holds _stats_lock)"""
+    if _rate_series and _rate_series[-1][0] >= minute:
+        return
+    start = _rate_series[-1][0] + 60 if _rate_series else minute
+    # Never append more buckets than the ring can hold
+    start = max(start, minute - (RATE_SERIES_MINUTES - 1) * 60)
+    for bucket in range(start, minute + 60, 60):
+        _rate_series.append([bucket, 0, 0])
+
+def _count_rate(counter, at):
+    """Add one event to its minute bucket (caller holds _stats_lock)"""
+    minute = int(at // 60) * 60
+    _advance_rate_series(minute)
+    column = _RATE_COUNTERS.index(counter) + 1
+    for bucket in reversed(_rate_series):
+        if bucket[0] == minute:
+            bucket[column] += 1
+            break
+        if bucket[0] < minute:
+            break
+
+def update_stats(action_type, at=None):
     """Update statistics for dashboard"""
-    global dashboard_stats
-    dashboard_stats["last_activity"] = time.time()
-    
-    if action_type == "message":
-        dashboard_stats["total_messages"] += 1
-    elif action_type == "ai_request":
-        dashboard_stats["ai_requests"] += 1
-    elif action_type == "registration":
-        dashboard_stats["registrations"] += 1
-    elif action_type == "error":
-        dashboard_stats["errors"] += 1
-    elif action_type == "job_apply":
-        dashboard_stats["job_applications"] += 1
+    at = at or time.time()
+    with _stats_lock:
+        dashboard_stats["last_activity"] = at
+        delta = {"last_activity": _format_last_activity()}
+        
+        counter = _COUNTER_ACTIONS.get(action_type)
+        if counter:
+            dashboard_stats[counter] += 1
+            delta[counter] = dashboard_stats[counter]
+            if counter in _RATE_COUNTERS:
+                _count_rate(counter, at)
+
+    publish_event("counters", delta)
+
+def get_stats_snapshot():
+    """Consistent copy of dashboard_stats"""
+    with _stats_lock:
+        return dict(dashboard_stats)
+
+def get_counters_snapshot():
+    """Consistent copy of the activity counters only (counter name -> value)"""
+    with _stats_lock:
+        return {counter: dashboard_stats[counter] for counter in _COUNTER_ACTIONS.values()}
+
+def get_rate_series():
+    """Per-minute message and AI request counts for the last RATE_SERIES_MINUTES minutes"""
+    with _stats_lock:
+        _advance_rate_series(int(time.time() // 60) * 60)
+        series = [list(bucket) for bucket in _rate_series]
+    return {
+        "interval": 60,
+        "labels": [datetime.fromtimestamp(b[0]).strftime('%H:%M') for b in series],
+        "messages": [b[1] for b in series],
+        "ai_requests": [b[2] for b in series],
+    }
+
+def restore_stats():
+    """Add the persisted counters to this process's counters (call after init_db)"""
+    global _stats_restored
+    if _stats_restored:
+        return True
+    try:
+        saved = get_counters()
+    except Exception as e:
+        # Keep snapshots off so the saved totals are not overwritten with small numbers
+        logger.error(f"Error restoring dashboard counters: {e}")
+        return False
+    with _stats_lock:
+        if not _stats_restored:
+            for counter in _COUNTER_ACTIONS.values():
+                dashboard_stats[counter] += saved.get(counter, 0)
+            _stats_restored = True
+    logger.info(f"Dashboard counters restored: {saved}")
+    return True
+
+def save_stats_snapshot():
+    """Queue the counters for the dashboard_counters table if they changed"""
+    global _last_snapshot
+    if not _stats_restored:
+        return False
+    counters = get_counters_snapshot()
+    if counters == _last_snapshot:
+        return False
+    save_counters(counters)
+    _last_snapshot = counters
+    return True
+
+def _format_last_activity(last_activity=None):
+    """last_activity as shown on the dashboard"""
+    if last_activity is None:
+        last_activity = dashboard_stats["last_activity"]
+    return datetime.fromtimestamp(last_activity).strftime('%Y-%m-%d %H:%M:%S')
+
+def _format_uptime():
+    """Uptime as shown on the dashboard, e.g. '3h 12m'"""
+    uptime_seconds = time.time() - dashboard_stats["bot_start_time"]
+    return f"{int(uptime_seconds // 3600)}h {int((uptime_seconds % 3600) // 60)}m"
+
+def _count_fields(counts):
+    """Dashboard card/chart fields derived from db.get_dashboard_counts()"""
+    job_status = counts["job_status"]
+    total_users = counts["total_users"]
+    total_points = counts["total_points"]
+    top_user = counts["top_user"]
+    return {
+        "total_users": total_users,
+        "total_jobs": counts["total_jobs"],
+        "active_jobs": job_status.get('aktif', 0),
+        "closed_jobs": job_status.get('close', 0),
+        "paid_jobs": job_status.get('cair', 0),
+        "job_status_distribution": job_status,
+        "total_points": total_points,
+        "total_promotions": counts["total_promotions"],
+        "weekly_promotions": counts["weekly_promotions"],
+        "avg_points_per_user": total_points / total_users if total_users else 0,
+        "top_user": {
+            "username": top_user['username'] if top_user else "N/A",
+            "points": top_user['points'] if top_user else 0
+        },
+    }
+
+# ==== ENDPOINT CACHE ====
+# Per-endpoint TTL caches for the JSON APIs. Concurrent requests for the same
+# key share one computation, and logged activities drop whatever they changed
+# once their rows are committed.
+
+ENDPOINT_CACHE_TTL = {   # seconds
+    "stats": 5,
+    "users": 30,
+    "user_counts": 30,   # /api/users totals, keyed by search only (shared by every page)
+    "jobs": 30,
+    "analytics": 60,
+}
+
+_endpoint_caches = {name: TTLCache(maxsize=64, ttl=ttl) for name, ttl in ENDPOINT_CACHE_TTL.items()}
+
+# Activities that change member or job data
+_MEMBER_ACTIONS = {
+    "registration", "edit_info", "delete_member", "reset_points", "add_points",
+    "add_badge", "reset_badges", "reset_apply",
+}
+_JOB_ACTIONS = {"job_posted", "job_updated", "delete_job", "reset_jobs", "job_apply", "reset_apply"}
+
+def invalidate_endpoint_cache(*names):
+    """Drop cached responses of the given endpoints (all of them when none given)"""
+    for name in names or _endpoint_caches:
+        _endpoint_caches[name].clear()
+
+def _invalidate_for_action(action_type):
+    """Drop cached endpoints an activity made stale (others expire by TTL)"""
+    if action_type in _MEMBER_ACTIONS:
+        invalidate_endpoint_cache("stats", "users", "user_counts", "analytics")
+    if action_type in _JOB_ACTIONS:
+        invalidate_endpoint_cache("stats", "jobs", "analytics")
+
+def _cached_json(name, key, builder):
+    """JSON response for builder() served through the endpoint cache"""
+    cache = _endpoint_caches[name]
+    payload, age, hit = cache.get_or_load(key, builder)
+    response = jsonify(payload)
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    response.headers["X-Cache-Age"] = f"{age:.1f}"
+    response.headers["X-Cache-Hit-Ratio"] = f"{cache.stats()['hit_rate']:.4f}"
+    return response
+
+# ==== LIVE EVENTS (SSE) ====
+# log_activity and update_stats hand events to one broadcaster thread, which
+# fans them out to every open /api/stream. Each change is serialized, and for
+# member/job changes re-aggregated, once no matter how many tabs are open.
+
+SSE_CLIENT_QUEUE_SIZE = 256   # pending events per client before it must resync
+SSE_HEARTBEAT_INTERVAL = 15   # seconds between keep-alive pings
+# Every open stream holds a server worker thread; past this many, clients poll instead
+SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", "8"))
+
+# Activities that change the totals/job cards and need a fresh aggregate
+_TOTALS_ACTIONS = _MEMBER_ACTIONS | _JOB_ACTIONS
+
+_event_queue = queue.Queue()
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+_broadcaster_thread = None
+_broadcaster_lock = threading.Lock()
+
+def _format_sse(event, data):
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def publish_event(event, data):
+    """Queue an event for connected dashboards (no-op when nobody is watching)"""
+    if not _subscribers:
+        return
+    _ensure_broadcaster()
+    _event_queue.put((event, data))
+
+def _ensure_broadcaster():
+    """Start the broadcaster thread on first use"""
+    global _broadcaster_thread
+    if _broadcaster_thread is not None and _broadcaster_thread.is_alive():
+        return
+    with _broadcaster_lock:
+        if _broadcaster_thread is None or not _broadcaster_thread.is_alive():
+            _broadcaster_thread = Thread(target=_broadcast_loop, name="dashboard-events", daemon=True)
+            _broadcaster_thread.start()
+
+def _deliver(client_queue, messages):
+    """Put messages on a client queue; a client that fell behind is told to resync"""
+    for message in messages:
+        try:
+            client_queue.put_nowait(message)
+        except queue.Full:
+            # Drop the backlog; the client reloads full stats on "resync"
+            while True:
+                try:
+                    client_queue.get_nowait()
+                except queue.Empty:
+                    break
+            client_queue.put_nowait(_format_sse("resync", {}))
+            return
+
+def _broadcast_loop():
+    """Coalesce queued events and fan them out to all subscribers"""
+    while True:
+        batch = [_event_queue.get()]
+        while True:
+            try:
+                batch.append(_event_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        messages = []
+        counters = {}
+        needs_totals = False
+        for event, data in batch:
+            if event == "counters":
+                # Only the latest value of each counter matters
+                counters.update(data)
+                continue
+            if event == "activity" and data.get("type") in _TOTALS_ACTIONS:
+                needs_totals = True
+            messages.append(_format_sse(event, data))
+        if counters:
+            messages.append(_format_sse("counters", counters))
+        if needs_totals:
+            try:
+                messages.append(_format_sse("totals", _count_fields(get_dashboard_counts())))
+            except Exception as e:
+                logger.error(f"Live totals update failed: {e}")
+
+        with _subscribers_lock:
+            subscribers = list(_subscribers)
+        for client_queue in subscribers:
+            _deliver(client_queue, messages)
+
+@dashboard_app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream of dashboard changes"""
+    with _subscribers_lock:
+        full = len(_subscribers) >= SSE_MAX_CLIENTS
+    if full:
+        # EventSource gives up on a 503 and the page falls back to polling
+        return jsonify({"error": "Too many live clients"}), 503, {"Retry-After": "60"}
+
+    client_queue = queue.Queue(maxsize=SSE_CLIENT_QUEUE_SIZE)
+
+    def stream():
+        with _subscribers_lock:
+            _subscribers.add(client_queue)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = client_queue.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    message = _format_sse("ping", {"uptime": _format_uptime()})
+                yield message
+        finally:
+            with _subscribers_lock:
+                _subscribers.discard(client_queue)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
 
 @dashboard_app.route('/')
 def dashboard_home():
     """Main dashboard page"""
     return render_template('dashboard.html')
 
+def _build_stats():
+    """Payload of /api/stats"""
+    # Totals come from SQL aggregates; cost does not grow with the member count
+    counts = get_dashboard_counts()
+
+    # Calculate uptime
+    uptime_seconds = time.time() - dashboard_stats["bot_start_time"]
+
+    # Get recent activities (activity_logs is created by init_db)
+    with get_read_conn() as conn:
+        cur = conn.cursor()
+
+        # Get recent activities (last 20)
+        cur.execute("""
+            SELECT timestamp, action_type, description, user_id
+            FROM activity_logs 
+            ORDER BY timestamp DESC 
+            LIMIT 20
+        """)
+        recent_activities = cur.fetchall()
+
+    # Environment status
+    env_status = {
+        "bot_token": "✅ Configured" if os.getenv("BOT_TOKEN") else "❌ Missing",
+        "gemini_api": "✅ Configured" if os.getenv("GEMINI_API_KEY") else "❌ Missing",
+        "owner_id": "✅ Configured" if os.getenv("OWNER_ID") else "❌ Missing"
+    }
+
+    counters = get_stats_snapshot()
+    stats = {
+        "bot_status": "online",
+        "uptime": _format_uptime(),
+        "uptime_seconds": uptime_seconds,
+        "total_messages": counters["total_messages"],
+        "ai_requests": counters["ai_requests"],
+        "registrations": counters["registrations"],
+        "job_applications": counters["job_applications"],
+        "errors": counters["errors"],
+        "last_activity": _format_last_activity(counters["last_activity"]),
+        "environment_vars": env_status,
+        "user_cache": get_user_cache_stats(),
+        **_count_fields(counts),
+        "recent_activities": [
+            {
+                "timestamp": activity[0],
+                "type": activity[1],
+                "description": activity[2],
+                "user_id": activity[3]
+            } for activity in recent_activities
+        ]
+    }
+    return stats
+
 @dashboard_app.route('/api/stats')
 def api_stats():
     """API endpoint for real-time statistics"""
     try:
-        # Get database stats
-        users = get_all_users()
-        jobs = get_all_jobs()
-        
-        # Calculate uptime
-        uptime_seconds = time.time() - dashboard_stats["bot_start_time"]
-        uptime_hours = int(uptime_seconds // 3600)
-        uptime_minutes = int((uptime_seconds % 3600) // 60)
-        
-        # Get recent activities
-        with get_conn() as conn:
-            cur = conn.cursor()
-            
-            # Ensure activity_logs table exists
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS activity_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    action_type TEXT,
-                    user_id TEXT,
-                    description TEXT
-                )
-            """)
-            
-            # Get recent activities (last 20)
-            cur.execute("""
-                SELECT timestamp, action_type, description, user_id
-                FROM activity_logs 
-                ORDER BY timestamp DESC 
-                LIMIT 20
-            """)
-            recent_activities = cur.fetchall()
-        
-        # Calculate job statistics
-        active_jobs = len([job for job in jobs if job.get('status') == 'aktif'])
-        closed_jobs = len([job for job in jobs if job.get('status') == 'close'])
-        paid_jobs = len([job for job in jobs if job.get('status') == 'cair'])
-        
-        # Calculate user statistics
-        total_points = sum(user.get('points', 0) for user in users)
-        top_user = max(users, key=lambda x: x.get('points', 0)) if users else None
-        
-        # Environment status
-        env_status = {
-            "bot_token": "✅ Configured" if os.getenv("BOT_TOKEN") else "❌ Missing",
-            "gemini_api": "✅ Configured" if os.getenv("GEMINI_API_KEY") else "❌ Missing",
-            "owner_id": "✅ Configured" if os.getenv("OWNER_ID") else "❌ Missing"
-        }
-        
-        # Performance metrics
-        with get_conn() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM promotions")
-            total_promotions = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM promotions WHERE created_at >= date('now', '-7 days')")
-            weekly_promotions = cur.fetchone()[0]
-
-        stats = {
-            "bot_status": "online",
-            "uptime": f"{uptime_hours}h {uptime_minutes}m",
-            "uptime_seconds": uptime_seconds,
-            "total_users": len(users),
-            "total_jobs": len(jobs),
-            "active_jobs": active_jobs,
-            "closed_jobs": closed_jobs,
-            "paid_jobs": paid_jobs,
-            "total_points": total_points,
-            "total_promotions": total_promotions,
-            "weekly_promotions": weekly_promotions,
-            "total_messages": dashboard_stats["total_messages"],
-            "ai_requests": dashboard_stats["ai_requests"],
-            "registrations": dashboard_stats["registrations"],
-            "job_applications": dashboard_stats["job_applications"],
-            "errors": dashboard_stats["errors"],
-            "avg_points_per_user": total_points / len(users) if users else 0,
-            "last_activity": datetime.fromtimestamp(dashboard_stats["last_activity"]).strftime('%Y-%m-%d %H:%M:%S'),
-            "environment_vars": env_status,
-            "top_user": {
-                "username": top_user['username'] if top_user else "N/A",
-                "points": top_user.get('points', 0) if top_user else 0
-            },
-            "recent_activities": [
-                {
-                    "timestamp": activity[0],
-                    "type": activity[1],
-                    "description": activity[2],
-                    "user_id": activity[3]
-                } for activity in recent_activities
-            ]
-        }
-        
-        return jsonify(stats)
+        return _cached_json("stats", "", _build_stats)
         
     except Exception as e:
         logger.error(f"Dashboard stats error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@dashboard_app.route('/api/rates')
+def api_rates():
+    """API endpoint for per-minute message and AI request rates"""
+    try:
+        return jsonify(get_rate_series())
+
+    except Exception as e:
+        logger.error(f"Dashboard rates error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def _encode_cursor(user):
+    """Opaque keyset cursor pointing after this user row"""
+    raw = json.dumps([user['created_at'], user['user_id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_cursor(cursor):
+    """(created_at, user_id) from a cursor made by _encode_cursor"""
+    created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return created_at, user_id
+
 @dashboard_app.route('/api/users')
 def api_users():
     """API endpoint for user data"""
     try:
         page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
+        limit = min(int(request.args.get('limit', 20)), 100)
         search = request.args.get('search', '').strip()
+        cursor = request.args.get('cursor', '')
         
-        users = get_all_users()
-        
-        # Filter users by search term
-        if search:
-            users = [
-                user for user in users 
-                if search.lower() in user['username'].lower()
-            ]
-        
-        # Paginate
-        total = len(users)
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_users = users[start_idx:end_idx]
+        # Keyset paging when the client sends the previous page's cursor,
+        # LIMIT/OFFSET otherwise (jumping straight to a page number)
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid cursor"}), 400
         
-        # Add additional stats for each user
-        for user in paginated_users:
-            from db import get_badges, get_total_applies, get_referrals_by_username
-            user['badges'] = get_badges(user['user_id'])
-            user['total_applies'] = get_total_applies(user['user_id'])
-            user['referrals'] = len(get_referrals_by_username(user['username']))
+        def build():
+            users = get_users_page(
+                limit=limit, search=search, after=after, offset=(page - 1) * limit
+            )
+            # The LIKE scan for the total runs once per search term, not per page
+            total, _, _ = _endpoint_caches["user_counts"].get_or_load(search, lambda: count_users(search))
+            return {
+                "total": total,
+                "page": page,
+                "limit": limit,
+                "pages": (total + limit - 1) // limit,
+                "next_cursor": _encode_cursor(users[-1]) if len(users) == limit else None,
+                "users": users
+            }
         
-        return jsonify({
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "pages": (total + limit - 1) // limit,
-            "users": paginated_users
-        })
+        return _cached_json("users", (page, limit, search, cursor), build)
         
     except Exception as e:
         logger.error(f"Dashboard users error: {e}")
@@ -200,34 +484,24 @@ def api_jobs():
     """API endpoint for job data"""
     try:
         page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
+        limit = min(int(request.args.get('limit', 20)), 100)
         status_filter = request.args.get('status', '')
         
-        jobs = get_all_jobs()
-        
-        # Filter by status
-        if status_filter:
-            jobs = [job for job in jobs if job['status'] == status_filter]
-        
-        # Add applicant count for each job
-        for job in jobs:
-            from db import get_applicants_by_job
-            applicants = get_applicants_by_job(job['id'])
-            job['applicant_count'] = len(applicants)
-        
-        # Paginate
-        total = len(jobs)
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_jobs = jobs[start_idx:end_idx]
+        def build():
+            # Filtering and paging happen in SQL; applicant_count is a column on jobs
+            total = count_jobs(status_filter)
+            paginated_jobs = get_jobs_page(
+                limit=limit, offset=(page - 1) * limit, status=status_filter
+            )
+            return {
+                "total": total,
+                "page": page,
+                "limit": limit,
+                "pages": (total + limit - 1) // limit,
+                "jobs": paginated_jobs
+            }
         
-        return jsonify({
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "pages": (total + limit - 1) // limit,
-            "jobs": paginated_jobs
-        })
+        return _cached_json("jobs", (page, limit, status_filter), build)
         
     except Exception as e:
         logger.error(f"Dashboard jobs error: {e}")
@@ -239,7 +513,9 @@ def debug_info():
     try:
         import sys
         import platform
+        from server import HTTP_HOST, HTTP_PORTS
         
+        ports = ", ".join(str(port) for port in HTTP_PORTS)
         debug_data = {
             "python_version": sys.version,
             "platform": platform.platform(),
@@ -251,116 +527,136 @@ def debug_info():
             "dashboard_html_exists": os.path.exists('templates/dashboard.html'),
             "dashboard_css_exists": os.path.exists('static/dashboard.css'),
             "dashboard_js_exists": os.path.exists('static/dashboard.js'),
-            "port_info": "Running on 0.0.0.0:5000"
+            "port_info": f"Running on {HTTP_HOST}:{ports} (server.py)"
         }
         
         return jsonify(debug_data)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def _build_analytics():
+    """Payload of /api/analytics"""
+    # Everything comes from the rollup tables (see db.record_activity)
+    daily_activities = get_daily_activity(days=7)
+    hourly_activities = get_hourly_activity(hours=24)
+    registration_trend = get_daily_activity(days=30, action_type="registration")
+    
+    # Job status distribution
+    job_status_counts = get_job_status_counts()
+    
+    # Prepare chart data
+    chart_data = {
+        "daily_activities": [
+            {"date": row[0], "type": row[1], "count": row[2]}
+            for row in daily_activities
+        ],
+        "hourly_activities": [
+            {"hour": row[0], "type": row[1], "count": row[2]}
+            for row in hourly_activities
+        ],
+        "registration_trend": [
+            {"date": row[0], "count": row[2]}
+            for row in reversed(registration_trend)
+        ],
+        "job_status_distribution": job_status_counts
+    }
+    return chart_data
+
 @dashboard_app.route('/api/analytics')
 def api_analytics():
     """API endpoint for analytics data"""
     try:
-        # Get activity logs for the last 7 days
-        with get_conn() as conn:
-            cur = conn.cursor()
-            
-            # Daily activity counts for the last 7 days
-            cur.execute("""
-                SELECT DATE(timestamp) as date, action_type, COUNT(*) as count
-                FROM activity_logs 
-                WHERE timestamp >= date('now', '-7 days')
-                GROUP BY DATE(timestamp), action_type
-                ORDER BY date DESC
-            """)
-            daily_activities = cur.fetchall()
-            
-            # User registration over time
-            cur.execute("""
-                SELECT DATE(created_at) as date, COUNT(*) as count
-                FROM users
-                WHERE created_at >= date('now', '-30 days')
-                GROUP BY DATE(created_at)
-                ORDER BY date
-            """)
-            registration_trend = cur.fetchall()
-            
-            # Job status distribution
-            jobs = get_all_jobs()
-            job_status_counts = {}
-            for job in jobs:
-                status = job['status']
-                job_status_counts[status] = job_status_counts.get(status, 0) + 1
-        
-        # Prepare chart data
-        chart_data = {
-            "daily_activities": [
-                {"date": row[0], "type": row[1], "count": row[2]}
-                for row in daily_activities
-            ],
-            "registration_trend": [
-                {"date": row[0], "count": row[1]}
-                for row in registration_trend
-            ],
-            "job_status_distribution": job_status_counts
-        }
-        
-        return jsonify(chart_data)
+        return _cached_json("analytics", "", _build_analytics)
         
     except Exception as e:
         logger.error(f"Dashboard analytics error: {e}")
         return jsonify({"error": str(e)}), 500
 
+# ==== ACTIVITY QUEUE ====
+# log_activity only appends to a deque (atomic in CPython, no lock taken), so
+# handlers never wait on the database. A flusher thread drains it in bulk:
+# rows and rollups go to the batched writer and counters are updated once per
+# batch; endpoint cache invalidation and live events follow the commit.
+
+ACTIVITY_FLUSH_INTERVAL = 0.25  # seconds between drains
+
+_activity_buffer = collections.deque()
+_activity_flusher = None
+_activity_flusher_lock = threading.Lock()
+_activity_drain_lock = threading.Lock()
+
 def log_activity(action_type, user_id=None, description=""):
-    """Log activity to database"""
+    """Log activity (buffered; written by the activity flusher)"""
+    _activity_buffer.append((time.time(), action_type, user_id, description))
+    if _activity_flusher is None:
+        _start_activity_flusher()
+
+def _start_activity_flusher():
+    """Start the activity flusher thread once"""
+    global _activity_flusher
+    with _activity_flusher_lock:
+        if _activity_flusher is None:
+            _activity_flusher = Thread(target=_activity_flush_loop, name="activity-flusher", daemon=True)
+            _activity_flusher.start()
+
+def _activity_flush_loop():
+    """Drain the activity buffer every ACTIVITY_FLUSH_INTERVAL seconds"""
+    next_snapshot = time.monotonic() + COUNTER_SNAPSHOT_INTERVAL
+    while True:
+        time.sleep(ACTIVITY_FLUSH_INTERVAL)
+        try:
+            flush_activity()
+        except Exception as e:
+            logger.error(f"Error logging activity: {e}")
+
+        if time.monotonic() >= next_snapshot:
+            next_snapshot = time.monotonic() + COUNTER_SNAPSHOT_INTERVAL
+            try:
+                save_stats_snapshot()
+            except Exception as e:
+                logger.error(f"Error saving dashboard counters: {e}")
+
+def flush_activity():
+    """Write everything buffered by log_activity now; returns the number of events"""
+    with _activity_drain_lock:
+        batch = []
+        while True:
+            try:
+                batch.append(_activity_buffer.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return 0
+
+        def on_commit(timestamps):
+            # Runs on the writer thread after the rows and every write queued before
+            # them (point updates, ...) are committed, so a request in between can
+            # no longer re-cache the old data for a full TTL
+            for action_type in {event[1] for event in batch}:
+                _invalidate_for_action(action_type)
+            for (_, action_type, user_id, description), timestamp in zip(batch, timestamps):
+                publish_event("activity", {
+                    "timestamp": timestamp,
+                    "type": action_type,
+                    "description": description,
+                    "user_id": user_id
+                })
+
+        record_activities(batch, on_commit=on_commit)
+
+        for created, action_type, _, _ in batch:
+            update_stats(action_type, at=created)
+        return len(batch)
+
+def persist_dashboard_state():
+    """Flush buffered activity and snapshot the counters (call on shutdown)"""
     try:
-        with get_conn() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO activity_logs (action_type, user_id, description)
-                VALUES (?, ?, ?)
-            """, (action_type, user_id, description))
-            conn.commit()
-            
-        # Update stats
-        update_stats(action_type)
-        
+        flush_activity()
     except Exception as e:
         logger.error(f"Error logging activity: {e}")
-
-def run_dashboard():
-    """Run the dashboard Flask app"""
     try:
-        # Ensure port 5000 is available
-        import socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result = sock.connect_ex(('127.0.0.1', 5000))
-        sock.close()
-        
-        if result == 0:
-            logger.warning("Port 5000 already in use, trying port 5001")
-            dashboard_app.run(host="0.0.0.0", port=5001, debug=False, use_reloader=False, threaded=True)
-        else:
-            dashboard_app.run(host="0.0.0.0", port=5000, debug=False, use_reloader=False, threaded=True)
+        save_stats_snapshot()
     except Exception as e:
-        logger.error(f"Dashboard server failed to start: {e}")
-        print(f"❌ Dashboard error: {e}")
+        logger.error(f"Error saving dashboard counters: {e}")
 
-def start_dashboard():
-    """Start the dashboard in a daemon thread"""
-    try:
-        t = Thread(target=run_dashboard, daemon=True)
-        t.start()
-        
-        logger.info("Dashboard server started successfully")
-        print("🌐 Dashboard started on http://0.0.0.0:5000")
-        print("📊 Dashboard available at: /")
-        print("📈 API Stats available at: /api/stats")
-        print("👥 Users API available at: /api/users")
-        print("💼 Jobs API available at: /api/jobs")
-        print("📊 Analytics API available at: /api/analytics")
-        
-    except Exception as e:
-        logger.error(f"Failed to start dashboard: {e}")
-        print(f"❌ Failed to start dashboard: {e}")
+atexit.register(persist_dashboard_state)
@@ -1,22 +1,129 @@
 import sqlite3
 import logging
-from datetime import datetime
+import threading
+import queue
+import atexit
+import time
+from datetime import datetime, timezone
 from contextlib import contextmanager
+from pathlib import Path
 import json
 
+from cache import TTLCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 DB_FILE = "database.db"
 
+GROUP_MESSAGE_LIMIT = 100  # group messages kept per chat (ring size, see migrations.py)
+
+# Connection pool settings
+POOL_MAX_IDLE = 8              # idle connections kept open for reuse (per pool)
+POOL_HEALTHCHECK_INTERVAL = 60  # seconds idle before a connection is re-validated
+
+# WAL tuning: NORMAL is durable across application crashes in WAL mode and
+# avoids an fsync per commit; the WAL is checkpointed every ~4MB of pages and
+# truncated back to JOURNAL_SIZE_LIMIT afterwards.
+WAL_SYNCHRONOUS = "NORMAL"
+WAL_AUTOCHECKPOINT_PAGES = 1000
+JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+# User row cache (see USER CACHE below)
+USER_CACHE_SIZE = 5000  # cached user rows
+USER_CACHE_TTL = 300    # seconds; writes through db.py invalidate immediately
+
+# Bulk lookups: keys per IN (...) query, well below SQLite's bound-variable limit
+BULK_LOOKUP_CHUNK = 500
+
+# Separate pools for read-write and read-only connections
+_pools = {False: [], True: []}
+_pool_lock = threading.Lock()
+
+def _open_conn(readonly=False):
+    """Open a new connection and apply per-connection pragmas once"""
+    # check_same_thread=False: the pool hands a connection to one thread at a time,
+    # but not always the thread that opened it (Flask request threads, PTB loop, ...)
+    if readonly:
+        uri = f"{Path(DB_FILE).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=30.0, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(DB_FILE, timeout=30.0, check_same_thread=False)
+        conn.execute(f"PRAGMA synchronous = {WAL_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA wal_autocheckpoint = {WAL_AUTOCHECKPOINT_PAGES}")
+        conn.execute(f"PRAGMA journal_size_limit = {JOURNAL_SIZE_LIMIT}")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+def _acquire_conn(readonly=False):
+    """Take an idle connection from the pool, or open a new one"""
+    pool = _pools[readonly]
+    while True:
+        with _pool_lock:
+            if not pool:
+                break
+            conn, released_at = pool.pop()
+
+        # Only re-validate connections that sat idle for a while
+        if time.monotonic() - released_at < POOL_HEALTHCHECK_INTERVAL:
+            return conn
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding unhealthy pooled connection: {e}")
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    return _open_conn(readonly)
+
+def _release_conn(conn, readonly=False):
+    """Return a connection to the pool, closing it if the pool is full"""
+    try:
+        # Never hand out a connection with a dangling transaction (and its locks).
+        # For readers this also ends the WAL snapshot so checkpoints can progress.
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error as e:
+        logger.warning(f"Closing connection that failed to reset: {e}")
+        conn.close()
+        return
+
+    pool = _pools[readonly]
+    with _pool_lock:
+        if len(pool) < POOL_MAX_IDLE:
+            pool.append((conn, time.monotonic()))
+            return
+    conn.close()
+
+def close_all_connections():
+    """Checkpoint the WAL and close every idle pooled connection (call on shutdown)"""
+    stop_writer()
+    try:
+        with get_conn() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except Exception as e:
+        logger.warning(f"WAL checkpoint on shutdown failed: {e}")
+
+    with _pool_lock:
+        idle = [conn for pool in _pools.values() for conn, _ in pool]
+        for pool in _pools.values():
+            pool.clear()
+    for conn in idle:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
 @contextmanager
 def get_conn():
-    """Context manager for database connections"""
+    """Context manager for pooled database connections"""
     conn = None
     try:
-        conn = sqlite3.connect(DB_FILE, timeout=30.0)
-        conn.execute("PRAGMA foreign_keys = ON")
+        conn = _acquire_conn()
         yield conn
     except Exception as e:
         if conn:
@@ -25,121 +132,235 @@ def get_conn():
         raise
     finally:
         if conn:
-            conn.close()
+            _release_conn(conn)
+
+@contextmanager
+def get_read_conn():
+    """Context manager for pooled read-only connections (dashboard, metrics)"""
+    conn = None
+    try:
+        conn = _acquire_conn(readonly=True)
+        yield conn
+    except Exception as e:
+        logger.error(f"Database read error: {e}")
+        raise
+    finally:
+        if conn:
+            _release_conn(conn, readonly=True)
+
+def _conn(readonly=False):
+    """Pick the read-only or read-write connection context"""
+    return get_read_conn() if readonly else get_conn()
+
+# ==== BATCHED WRITER ====
+# High-frequency writes (group messages, activity logs, point rewards) are queued
+# and committed by one background thread, many statements per transaction.
+
+WRITE_BATCH_SIZE = 500      # commit once this many writes are pending...
+WRITE_BATCH_INTERVAL = 0.5  # ...or once the oldest pending write is this old (seconds)
+
+_write_queue = queue.Queue()
+_writer_thread = None
+_writer_lock = threading.Lock()
+_WRITER_STOP = object()
+
+def _ensure_writer():
+    """Start the background writer thread on first use"""
+    global _writer_thread
+    if _writer_thread is not None and _writer_thread.is_alive():
+        return
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name="db-writer", daemon=True)
+            _writer_thread.start()
+
+def enqueue_write(sql, params=(), on_commit=None):
+    """Queue a write statement for the background writer (on_commit runs after it commits)"""
+    enqueue_writes([(sql, params)], on_commit)
+
+def enqueue_writes(statements, on_commit=None):
+    """Queue [(sql, params)] that must commit together (all or none, even on retry)"""
+    _ensure_writer()
+    _write_queue.put((tuple(statements), on_commit))
+
+def flush_writes(timeout=None):
+    """Block until every write queued before this call is committed"""
+    if _writer_thread is None or not _writer_thread.is_alive():
+        return True
+    done = threading.Event()
+    _write_queue.put(done)
+    return done.wait(timeout)
+
+def stop_writer(timeout=10.0):
+    """Drain the write queue and stop the writer thread (call on shutdown)"""
+    global _writer_thread
+    with _writer_lock:
+        thread = _writer_thread
+        _writer_thread = None
+    if thread is None or not thread.is_alive():
+        return
+    _write_queue.put(_WRITER_STOP)
+    thread.join(timeout)
+    if thread.is_alive():
+        logger.warning(f"Writer did not drain within {timeout}s, {_write_queue.qsize()} writes pending")
+
+def _collect_batch():
+    """Wait for the next write, then gather more until size, time or a marker"""
+    batch = [_write_queue.get()]
+    deadline = time.monotonic() + WRITE_BATCH_INTERVAL
+    while len(batch) < WRITE_BATCH_SIZE and isinstance(batch[-1], tuple):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_write_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def _run_callbacks(callbacks):
+    """Run on_commit callbacks; a failing callback never stops the writer"""
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"on_commit callback failed: {e}")
+
+def _commit_batch(conn, writes):
+    """Commit a list of (statements, on_commit) in one transaction"""
+    if not writes:
+        return
+    try:
+        for statements, _ in writes:
+            for sql, params in statements:
+                conn.execute(sql, params)
+        conn.commit()
+        _run_callbacks([cb for _, cb in writes if cb])
+        return
+    except sqlite3.Error as e:
+        conn.rollback()
+        logger.error(f"Batch of {len(writes)} writes failed ({e}), retrying one by one")
+
+    # Isolate the failing write(s) so one bad row does not drop the batch
+    for statements, on_commit in writes:
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Dropped queued write: {e} ({statements[0][0].split()[0]} ...)")
+            continue
+        if on_commit:
+            _run_callbacks([on_commit])
+
+def _writer_loop():
+    """Background writer: commit queued writes in batches until stopped"""
+    conn = _open_conn()
+    try:
+        while True:
+            batch = _collect_batch()
+            writes = [item for item in batch if isinstance(item, tuple)]
+            stop = batch[-1] is _WRITER_STOP
+
+            if stop:
+                # Drain whatever is still queued behind the stop marker
+                while True:
+                    try:
+                        item = _write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, tuple):
+                        writes.append(item)
+                    elif isinstance(item, threading.Event):
+                        batch.append(item)
+
+            _commit_batch(conn, writes)
+
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if stop:
+                break
+    except Exception as e:
+        logger.error(f"Writer thread crashed: {e}")
+    finally:
+        conn.close()
+
+atexit.register(stop_writer)
 
 def init_db():
-    """Initialize database with all required tables"""
+    """Initialize database: enable WAL and apply pending schema migrations"""
+    from migrations import apply_migrations, get_schema_version, LATEST_VERSION
+
     try:
         with get_conn() as conn:
-            cur = conn.cursor()
-            
-            # Users table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                username TEXT UNIQUE NOT NULL,
-                whatsapp TEXT NOT NULL,
-                telegram TEXT NOT NULL,
-                payment_method TEXT NOT NULL,
-                payment_number TEXT NOT NULL,
-                owner_name TEXT NOT NULL,
-                referrer TEXT,
-                points INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Jobs table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                fee TEXT NOT NULL,
-                desc TEXT NOT NULL,
-                status TEXT DEFAULT 'aktif',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Applicants table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS applicants (
-                job_id INTEGER,
-                user_id TEXT,
-                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (job_id, user_id),
-                FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE,
-                FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-            )
-            """)
-            
-            # Achievements table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS achievements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                badge_name TEXT NOT NULL,
-                awarded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-            )
-            """)
-            
-            # Activity logs table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS activity_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                action_type TEXT NOT NULL,
-                user_id TEXT,
-                description TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE SET NULL
-            )
-            """)
-            
-            # Group messages table for AI summary
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS group_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                chat_id TEXT NOT NULL,
-                user_id TEXT,
-                username TEXT,
-                message TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS promotions (
-                promo_id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                link TEXT NOT NULL,
-                type TEXT NOT NULL,
-                followers TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Indexes for better performance
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_users_points ON users(points)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_applicants_job_id ON applicants(job_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_applicants_user_id ON applicants(user_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_achievements_user_id ON achievements(user_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_logs_user_id ON activity_logs(user_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_logs_timestamp ON activity_logs(timestamp)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_promotions_user_id ON promotions(user_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_promotions_created_at ON promotions(created_at)")
-            
-            conn.commit()
+            # Only takes effect on a brand-new file (before WAL and the first table);
+            # existing databases are converted with maintenance.py enable-auto-vacuum
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+            # WAL lets dashboard readers run alongside bot writers; persistent per file
+            journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if journal_mode.lower() != "wal":
+                logger.warning(f"Could not enable WAL, journal_mode is {journal_mode}")
+
+            # Single version check on an up-to-date database
+            if get_schema_version(conn) < LATEST_VERSION:
+                applied = apply_migrations(conn)
+                logger.info(f"Applied schema migrations: {applied}")
+
             logger.info("✅ Database berhasil di inisialisasi")
             
     except Exception as e:
         logger.error(f"Gagal menginisialisasi database: {e}")
         raise
 
+# ==== USER CACHE ====
+# Read-through cache of user rows for get_user_by_id / get_user_by_username.
+# Rows are keyed by user_id (as str, like the users column); usernames map to a user_id and are re-checked
+# against the cached row, so a stale username entry can only cause a miss.
+# Every write to users in this module calls _invalidate_user after committing.
+
+_user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+_username_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+_user_cache_lock = threading.Lock()
+_user_cache_gen = 0  # bumped on every invalidation
+
+def _user_cache_generation():
+    """Current invalidation generation (read before querying users)"""
+    with _user_cache_lock:
+        return _user_cache_gen
+
+def _cache_user(user, generation):
+    """Cache a freshly read user row unless a write invalidated users meanwhile"""
+    with _user_cache_lock:
+        # A write committed between our SELECT and now: the row may be stale
+        if generation != _user_cache_gen:
+            return
+        _user_cache.set(user['user_id'], user)
+        _username_cache.set(user['username'], user['user_id'])
+
+def _invalidate_user(user_id=None):
+    """Drop one cached user (or all users when user_id is None)"""
+    global _user_cache_gen
+    with _user_cache_lock:
+        _user_cache_gen += 1
+        if user_id is None:
+            _user_cache.clear()
+            _username_cache.clear()
+        else:
+            _user_cache.pop(str(user_id))
+
+def clear_user_cache():
+    """Drop all cached users (e.g. after editing users outside db.py)"""
+    _invalidate_user()
+
+def get_user_cache_stats():
+    """Hit/miss counters of the user cache for the dashboard"""
+    stats = _user_cache.stats()
+    stats["usernames"] = len(_username_cache)
+    return stats
+
 # ==== USER FUNCTIONS ====
 
 def add_user(user_id, data):
@@ -163,13 +384,18 @@ def add_user(user_id, data):
                 data.get('points', 0)
             ))
             conn.commit()
+            _invalidate_user(user_id)
             logger.info(f"User {user_id} added/updated successfully")
     except Exception as e:
         logger.error(f"Failed to add user {user_id}: {e}")
         raise
 
 def get_user_by_id(user_id):
-    """Get user by ID"""
+    """Get user by ID (cached)"""
+    cached = _user_cache.get(str(user_id))
+    if cached is not None:
+        return dict(cached)
+    generation = _user_cache_generation()
     try:
         with get_conn() as conn:
             cur = conn.cursor()
@@ -182,14 +408,22 @@ def get_user_by_id(user_id):
             if row:
                 keys = ["user_id", "username", "whatsapp", "telegram", "payment_method", 
                        "payment_number", "owner_name", "referrer", "points", "created_at"]
-                return dict(zip(keys, row))
+                user = dict(zip(keys, row))
+                _cache_user(user, generation)
+                return dict(user)
         return None
     except Exception as e:
         logger.error(f"Failed to get user {user_id}: {e}")
         return None
 
 def get_user_by_username(username):
-    """Get user by username"""
+    """Get user by username (cached)"""
+    cached_id = _username_cache.get(username)
+    if cached_id is not None:
+        cached = _user_cache.get(cached_id)
+        if cached is not None and cached['username'] == username:
+            return dict(cached)
+    generation = _user_cache_generation()
     try:
         with get_conn() as conn:
             cur = conn.cursor()
@@ -202,16 +436,77 @@ def get_user_by_username(username):
             if row:
                 keys = ["user_id", "username", "whatsapp", "telegram", "payment_method", 
                        "payment_number", "owner_name", "referrer", "points", "created_at"]
-                return dict(zip(keys, row))
+                user = dict(zip(keys, row))
+                _cache_user(user, generation)
+                return dict(user)
         return None
     except Exception as e:
         logger.error(f"Failed to get user by username {username}: {e}")
         return None
 
-def get_all_users():
+def _select_users_in(column, values):
+    """Fetch users whose column is in values, one IN query per chunk; returns {value: user}"""
+    generation = _user_cache_generation()
+    found = {}
+    with get_conn() as conn:
+        cur = conn.cursor()
+        for start in range(0, len(values), BULK_LOOKUP_CHUNK):
+            chunk = values[start:start + BULK_LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cur.execute(f"""
+                SELECT user_id, username, whatsapp, telegram, payment_method, 
+                       payment_number, owner_name, referrer, points, created_at
+                FROM users WHERE {column} IN ({placeholders})
+            """, chunk)
+            keys = ["user_id", "username", "whatsapp", "telegram", "payment_method", 
+                   "payment_number", "owner_name", "referrer", "points", "created_at"]
+            for row in cur.fetchall():
+                user = dict(zip(keys, row))
+                _cache_user(user, generation)
+                found[user[column]] = dict(user)
+    return found
+
+def get_users_by_ids(user_ids):
+    """Get many users by ID at once; returns {user_id: user} for the IDs that exist"""
+    found = {}
+    missing = []
+    for user_id in dict.fromkeys(str(u) for u in user_ids):
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            found[user_id] = dict(cached)
+        else:
+            missing.append(user_id)
+    if not missing:
+        return found
+    try:
+        found.update(_select_users_in("user_id", missing))
+    except Exception as e:
+        logger.error(f"Failed to get {len(missing)} users by id: {e}")
+    return found
+
+def get_users_by_usernames(usernames):
+    """Get many users by username at once; returns {username: user} for the names that exist"""
+    found = {}
+    missing = []
+    for username in dict.fromkeys(usernames):
+        cached_id = _username_cache.get(username)
+        cached = _user_cache.get(cached_id) if cached_id is not None else None
+        if cached is not None and cached['username'] == username:
+            found[username] = dict(cached)
+        else:
+            missing.append(username)
+    if not missing:
+        return found
+    try:
+        found.update(_select_users_in("username", missing))
+    except Exception as e:
+        logger.error(f"Failed to get {len(missing)} users by username: {e}")
+    return found
+
+def get_all_users(readonly=False):
     """Get all users"""
     try:
-        with get_conn() as conn:
+        with _conn(readonly) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT user_id, username, whatsapp, telegram, payment_method, 
@@ -226,10 +521,10 @@ def get_all_users():
         logger.error(f"Failed to get all users: {e}")
         return []
 
-def get_referrals_by_username(referrer_username):
+def get_referrals_by_username(referrer_username, readonly=False):
     """Get all users referred by a specific username"""
     try:
-        with get_conn() as conn:
+        with _conn(readonly) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT user_id, username, whatsapp, telegram, payment_method, 
@@ -244,17 +539,76 @@ def get_referrals_by_username(referrer_username):
         logger.error(f"Failed to get referrals for {referrer_username}: {e}")
         return []
 
+def _like_pattern(search):
+    """Substring LIKE pattern with %, _ and \\ in the search term escaped"""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def count_users(search="", readonly=True):
+    """Number of users, optionally only those whose username contains search"""
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        if search:
+            cur.execute(
+                "SELECT COUNT(*) FROM users WHERE username LIKE ? ESCAPE '\\'",
+                (_like_pattern(search),)
+            )
+        else:
+            cur.execute("SELECT COUNT(*) FROM users")
+        return cur.fetchone()[0]
+
+def get_users_page(limit=20, search="", after=None, offset=0, readonly=True):
+    """One page of users (newest first) with badges, apply and referral counts"""
+    # after=(created_at, user_id) of the previous page's last row gives keyset
+    # paging; offset is only the fallback for jumping straight to page N
+    where = []
+    params = []
+    if search:
+        where.append("u.username LIKE ? ESCAPE '\\'")
+        params.append(_like_pattern(search))
+    if after is not None:
+        where.append("(u.created_at, u.user_id) < (?, ?)")
+        params.extend(after)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    params.extend([limit, 0 if after is not None else offset])
+
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        # Badges, applies and referrals are correlated subqueries, so they run
+        # only for the rows on this page (each one an index lookup)
+        cur.execute(f"""
+            SELECT u.user_id, u.username, u.whatsapp, u.telegram, u.payment_method,
+                   u.payment_number, u.owner_name, u.referrer, u.points, u.created_at,
+                   (SELECT group_concat(a.badge_name, char(31)) FROM achievements a
+                    WHERE a.user_id = u.user_id),
+                   (SELECT COUNT(*) FROM applicants ap WHERE ap.user_id = u.user_id),
+                   (SELECT COUNT(*) FROM users r WHERE r.referrer = u.username)
+            FROM users u
+            {where_sql}
+            ORDER BY u.created_at DESC, u.user_id DESC
+            LIMIT ? OFFSET ?
+        """, params)
+        rows = cur.fetchall()
+
+    keys = ["user_id", "username", "whatsapp", "telegram", "payment_method", 
+           "payment_number", "owner_name", "referrer", "points", "created_at"]
+    users = []
+    for row in rows:
+        user = dict(zip(keys, row[:10]))
+        user['badges'] = row[10].split("\x1f") if row[10] else []
+        user['total_applies'] = row[11]
+        user['referrals'] = row[12]
+        users.append(user)
+    return users
+
 def add_points_to_user(user_id, points_to_add):
-    """Add points to user"""
+    """Add points to user (queued; call flush_writes() before reading the new total)"""
     try:
-        with get_conn() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE users SET points = points + ?, updated_at = CURRENT_TIMESTAMP 
-                WHERE user_id = ?
-            """, (points_to_add, user_id))
-            conn.commit()
-            logger.info(f"Added {points_to_add} points to user {user_id}")
+        enqueue_write("""
+            UPDATE users SET points = points + ?, updated_at = CURRENT_TIMESTAMP 
+            WHERE user_id = ?
+        """, (points_to_add, user_id), on_commit=lambda: _invalidate_user(user_id))
+        logger.info(f"Added {points_to_add} points to user {user_id}")
     except Exception as e:
         logger.error(f"Failed to add points to user {user_id}: {e}")
         raise
@@ -265,6 +619,7 @@ def deduct_points(user_id, points):
         cur = conn.cursor()
         cur.execute("UPDATE users SET points = points - ? WHERE user_id=?", (points, user_id))
         conn.commit()
+    _invalidate_user(user_id)
 
 def delete_user_by_id(user_id):
     """Delete user and all related data"""
@@ -274,11 +629,28 @@ def delete_user_by_id(user_id):
             # Delete user (cascading will handle related data)
             cur.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
             conn.commit()
+            _invalidate_user(user_id)
             logger.info(f"User {user_id} deleted successfully")
     except Exception as e:
         logger.error(f"Failed to delete user {user_id}: {e}")
         raise
 
+def reset_user_points(user_id):
+    """Reset user points to 0"""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE users SET points = 0, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?",
+                (user_id,)
+            )
+            conn.commit()
+            _invalidate_user(user_id)
+            logger.info(f"Points reset for user {user_id}")
+    except Exception as e:
+        logger.error(f"Failed to reset points for user {user_id}: {e}")
+        raise
+
 # ==== JOB FUNCTIONS ====
 
 def add_job(title, fee, desc, status="aktif"):
@@ -315,10 +687,10 @@ def get_job_by_id(job_id):
         logger.error(f"Failed to get job {job_id}: {e}")
         return None
 
-def get_all_jobs():
+def get_all_jobs(readonly=False):
     """Get all jobs"""
     try:
-        with get_conn() as conn:
+        with _conn(readonly) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT id, title, fee, desc, status, created_at 
@@ -331,6 +703,72 @@ def get_all_jobs():
         logger.error(f"Failed to get all jobs: {e}")
         return []
 
+def count_jobs(status="", readonly=True):
+    """Number of jobs, optionally with the given status"""
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        if status:
+            cur.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,))
+        else:
+            cur.execute("SELECT COUNT(*) FROM jobs")
+        return cur.fetchone()[0]
+
+def get_jobs_page(limit=20, offset=0, status="", readonly=True):
+    """One page of jobs (newest first) with their applicant_count"""
+    where_sql = "WHERE status = ?" if status else ""
+    params = ([status] if status else []) + [limit, offset]
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT id, title, fee, desc, status, created_at, applicant_count
+            FROM jobs {where_sql}
+            ORDER BY created_at DESC
+            LIMIT ? OFFSET ?
+        """, params)
+        keys = ["id", "title", "fee", "desc", "status", "created_at", "applicant_count"]
+        return [dict(zip(keys, row)) for row in cur.fetchall()]
+
+def update_job_status(job_id, status):
+    """Update job status"""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (status, job_id)
+            )
+            conn.commit()
+            logger.info(f"Job {job_id} status changed to {status}")
+    except Exception as e:
+        logger.error(f"Failed to update job {job_id}: {e}")
+        raise
+
+def delete_job(job_id):
+    """Delete job and its applicants"""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM applicants WHERE job_id = ?", (job_id,))
+            cur.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            conn.commit()
+            logger.info(f"Job {job_id} deleted")
+    except Exception as e:
+        logger.error(f"Failed to delete job {job_id}: {e}")
+        raise
+
+def delete_all_jobs():
+    """Delete all jobs and applicants"""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM applicants")
+            cur.execute("DELETE FROM jobs")
+            conn.commit()
+            logger.info("All jobs deleted")
+    except Exception as e:
+        logger.error(f"Failed to delete all jobs: {e}")
+        raise
+
 # ==== APPLICANTS FUNCTIONS ====
 
 def add_applicant(job_id, user_id):
@@ -347,10 +785,10 @@ def add_applicant(job_id, user_id):
         logger.error(f"Failed to add applicant {user_id} to job {job_id}: {e}")
         raise
 
-def get_applicants_by_job(job_id):
+def get_applicants_by_job(job_id, readonly=False):
     """Get all applicants for a job"""
     try:
-        with get_conn() as conn:
+        with _conn(readonly) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT user_id FROM applicants WHERE job_id = ? ORDER BY applied_at
@@ -360,10 +798,10 @@ def get_applicants_by_job(job_id):
         logger.error(f"Failed to get applicants for job {job_id}: {e}")
         return []
 
-def get_total_applies(user_id):
+def get_total_applies(user_id, readonly=False):
     """Get total number of jobs applied by user"""
     try:
-        with get_conn() as conn:
+        with _conn(readonly) as conn:
             cur = conn.cursor()
             cur.execute("SELECT COUNT(*) FROM applicants WHERE user_id = ?", (user_id,))
             return cur.fetchone()[0]
@@ -371,6 +809,30 @@ def get_total_applies(user_id):
         logger.error(f"Failed to get total applies for user {user_id}: {e}")
         return 0
 
+def delete_applicants_by_user(user_id):
+    """Delete all job applications of a user"""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM applicants WHERE user_id = ?", (user_id,))
+            conn.commit()
+            logger.info(f"Applications reset for user {user_id}")
+    except Exception as e:
+        logger.error(f"Failed to reset applications for user {user_id}: {e}")
+        raise
+
+def delete_all_applicants():
+    """Delete all job applications"""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM applicants")
+            conn.commit()
+            logger.info("All applications reset")
+    except Exception as e:
+        logger.error(f"Failed to reset all applications: {e}")
+        raise
+
 # ==== ACHIEVEMENT FUNCTIONS ====
 
 def has_badge(user_id, badge_name):
@@ -400,10 +862,10 @@ def add_badge_to_user(user_id, badge_name):
         logger.error(f"Failed to add badge to user {user_id}: {e}")
         raise
 
-def get_badges(user_id):
+def get_badges(user_id, readonly=False):
     """Get all badges for user"""
     try:
-        with get_conn() as conn:
+        with _conn(readonly) as conn:
             cur = conn.cursor()
             cur.execute("""
                 SELECT badge_name FROM achievements WHERE user_id = ? ORDER BY awarded_at
@@ -413,30 +875,60 @@ def get_badges(user_id):
         logger.error(f"Failed to get badges for user {user_id}: {e}")
         return []
 
-# ==== GROUP MESSAGES FUNCTIONS ====
+def delete_badges_by_user(user_id):
+    """Delete all badges of a user"""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM achievements WHERE user_id = ?", (user_id,))
+            conn.commit()
+            logger.info(f"Badges reset for user {user_id}")
+    except Exception as e:
+        logger.error(f"Failed to reset badges for user {user_id}: {e}")
+        raise
 
-def save_group_message(chat_id, user_id, username, message):
-    """Save group message for AI summary"""
+def delete_all_badges():
+    """Delete all badges"""
     try:
         with get_conn() as conn:
             cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO group_messages (chat_id, user_id, username, message)
-                VALUES (?, ?, ?, ?)
-            """, (chat_id, user_id, username, message))
-            
-            # Keep only last 100 messages per chat
-            cur.execute("""
-                DELETE FROM group_messages 
-                WHERE chat_id = ? AND id NOT IN (
-                    SELECT id FROM group_messages 
-                    WHERE chat_id = ? 
-                    ORDER BY timestamp DESC 
-                    LIMIT 100
-                )
-            """, (chat_id, chat_id))
-            
+            cur.execute("DELETE FROM achievements")
             conn.commit()
+            logger.info("All badges reset")
+    except Exception as e:
+        logger.error(f"Failed to reset all badges: {e}")
+        raise
+
+# ==== GROUP MESSAGES FUNCTIONS ====
+
+_ring_seq = {}
+_ring_lock = threading.Lock()
+
+def _next_ring_seq(chat_id):
+    """Next message sequence number for a chat (loaded from the ring once)"""
+    with _ring_lock:
+        seq = _ring_seq.get(chat_id)
+    if seq is None:
+        with get_conn() as conn:
+            row = conn.execute(
+                "SELECT MAX(seq) FROM group_message_ring WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+        seq = row[0] or 0
+    with _ring_lock:
+        # Another thread may have loaded (and advanced) it in the meantime
+        seq = max(seq, _ring_seq.get(chat_id, 0)) + 1
+        _ring_seq[chat_id] = seq
+    return seq
+
+def save_group_message(chat_id, user_id, username, message):
+    """Save group message for AI summary (queued, overwrites the oldest ring slot)"""
+    try:
+        seq = _next_ring_seq(chat_id)
+        enqueue_write("""
+            INSERT OR REPLACE INTO group_message_ring
+                (chat_id, slot, seq, user_id, username, message, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (chat_id, seq % GROUP_MESSAGE_LIMIT, seq, user_id, username, message))
     except Exception as e:
         logger.error(f"Failed to save group message: {e}")
 
@@ -445,11 +937,13 @@ def get_recent_group_messages(chat_id, limit=50):
     try:
         with get_conn() as conn:
             cur = conn.cursor()
+            # Range scan of the (chat_id, slot) primary key; at most
+            # GROUP_MESSAGE_LIMIT rows per chat, so the ORDER BY is bounded
             cur.execute("""
                 SELECT username, message, timestamp 
-                FROM group_messages 
+                FROM group_message_ring 
                 WHERE chat_id = ? 
-                ORDER BY timestamp DESC 
+                ORDER BY seq DESC 
                 LIMIT ?
             """, (chat_id, limit))
             return cur.fetchall()
@@ -463,7 +957,8 @@ def save_promotion(promo_data):
     # INI YANG HARUS DIINDENTASI
     with get_conn() as conn:
         cur = conn.cursor()
-        followers_json = json.dumps(promo_data['followers'])
+        # Clicks live in promotion_clicks; the legacy column stays an empty list
+        followers_json = json.dumps(promo_data.get('followers', []))
         cur.execute("""
             INSERT INTO promotions (promo_id, user_id, link, type, followers, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -473,30 +968,179 @@ def save_promotion(promo_data):
 
 def get_promotion(promo_id):
     """Mengambil data promosi dari database."""
-    # INI YANG HARUS DIINDENTASI
     with get_conn() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT * FROM promotions WHERE promo_id=?", (promo_id,))
+        cur.execute("SELECT promo_id, user_id, link, type FROM promotions WHERE promo_id=?", (promo_id,))
         promo = cur.fetchone()
         if promo:
-            followers_list = json.loads(promo[4])
-            return {'promo_id': promo[0], 'user_id': promo[1], 'link': promo[2], 'type': promo[3], 'followers': followers_list}
+            return {'promo_id': promo[0], 'user_id': promo[1], 'link': promo[2], 'type': promo[3]}
     return None
-    # INI JUGA HARUS DIINDENTASI
 
 def add_follower(promo_id, follower_user_id):
-    """Menambahkan ID pengguna yang mengklik ke daftar follower sebuah promosi."""
-    # INI YANG HARUS DIINDENTASI
+    """Mencatat klik pengguna pada promosi. Return False jika sudah pernah klik."""
     with get_conn() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT followers FROM promotions WHERE promo_id=?", (promo_id,))
-        current_followers_json = cur.fetchone()[0]
+        cur.execute("""
+            INSERT OR IGNORE INTO promotion_clicks (promo_id, user_id) VALUES (?, ?)
+        """, (promo_id, follower_user_id))
+        conn.commit()
+        return cur.rowcount == 1
 
-        current_followers = json.loads(current_followers_json)
-        current_followers.append(follower_user_id)
+def get_promotion_followers(promo_id):
+    """Daftar user_id pengklik promosi, urut dari klik pertama."""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT user_id FROM promotion_clicks WHERE promo_id = ? ORDER BY clicked_at",
+            (promo_id,)
+        )
+        return [row[0] for row in cur.fetchall()]
 
-        updated_followers_json = json.dumps(current_followers)
+# ==== ACTIVITY FUNCTIONS ====
+# activity_logs keeps the raw events; activity_rollup_hourly/daily keep
+# per-action counts so the analytics charts never scan the raw log.
 
-        cur.execute("UPDATE promotions SET followers=? WHERE promo_id=?", (updated_followers_json, promo_id))
-        conn.commit()
-    # INI JUGA HARUS DIINDENTASI
\ No newline at end of file
+_ROLLUP_UPSERT = """
+    INSERT INTO {table} (bucket, action_type, count) VALUES (?, ?, ?)
+    ON CONFLICT (bucket, action_type) DO UPDATE SET count = count + excluded.count
+"""
+
+def record_activities(events, on_commit=None):
+    """Queue activity_logs rows plus rollup increments for (epoch, action_type, user_id, description) events
+
+    on_commit(timestamps) runs on the writer thread once they are committed.
+    """
+    statements = []
+    hourly = {}
+    daily = {}
+    timestamps = []
+    for created, action_type, user_id, description in events:
+        # One UTC timestamp for the row and both buckets, so they always agree
+        now = datetime.fromtimestamp(created, timezone.utc)
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+        timestamps.append(timestamp)
+        # Unregistered (or just deleted) users are stored as NULL, so the
+        # foreign key can never fail the writer batch
+        statements.append(("""
+            INSERT INTO activity_logs (timestamp, action_type, user_id, description)
+            VALUES (?, ?, (SELECT user_id FROM users WHERE user_id = ?), ?)
+        """, (timestamp, action_type, user_id, description)))
+        hour_key = (now.strftime('%Y-%m-%d %H:00:00'), action_type)
+        day_key = (now.strftime('%Y-%m-%d'), action_type)
+        hourly[hour_key] = hourly.get(hour_key, 0) + 1
+        daily[day_key] = daily.get(day_key, 0) + 1
+
+    # One upsert per bucket and action for the whole batch
+    for (bucket, action_type), count in hourly.items():
+        statements.append((_ROLLUP_UPSERT.format(table="activity_rollup_hourly"), (bucket, action_type, count)))
+    for (bucket, action_type), count in daily.items():
+        statements.append((_ROLLUP_UPSERT.format(table="activity_rollup_daily"), (bucket, action_type, count)))
+
+    # Rows and rollups commit (or are dropped) together, so the rollups always match the log
+    if statements:
+        enqueue_writes(statements, on_commit and (lambda: on_commit(timestamps)))
+    return timestamps
+
+def record_activity(action_type, user_id=None, description=""):
+    """Queue a single activity (see record_activities)"""
+    return record_activities([(time.time(), action_type, user_id, description)])[0]
+
+def get_daily_activity(days=7, action_type=None, readonly=True):
+    """Daily activity counts for the last N days, newest first"""
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        if action_type:
+            cur.execute("""
+                SELECT bucket, action_type, count FROM activity_rollup_daily
+                WHERE bucket >= date('now', ?) AND action_type = ?
+                ORDER BY bucket DESC
+            """, (f"-{days} days", action_type))
+        else:
+            cur.execute("""
+                SELECT bucket, action_type, count FROM activity_rollup_daily
+                WHERE bucket >= date('now', ?)
+                ORDER BY bucket DESC
+            """, (f"-{days} days",))
+        return cur.fetchall()
+
+def get_hourly_activity(hours=24, readonly=True):
+    """Hourly activity counts for the last N hours, newest first"""
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT bucket, action_type, count FROM activity_rollup_hourly
+            WHERE bucket >= strftime('%Y-%m-%d %H:00:00', 'now', ?)
+            ORDER BY bucket DESC
+        """, (f"-{hours} hours",))
+        return cur.fetchall()
+
+# ==== STATS FUNCTIONS ====
+# Aggregates for the dashboard, computed in SQL so nothing is materialized per row.
+
+def get_job_status_counts(readonly=True):
+    """Number of jobs per status, e.g. {'aktif': 3, 'close': 1}"""
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return dict(cur.fetchall())
+
+def get_dashboard_counts(readonly=True):
+    """User, job and promotion totals for /api/stats"""
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        # SUM(points) is answered from idx_users_points without touching the table
+        cur.execute("SELECT COUNT(*), COALESCE(SUM(points), 0) FROM users")
+        total_users, total_points = cur.fetchone()
+
+        cur.execute("SELECT username, points FROM users ORDER BY points DESC LIMIT 1")
+        top_user = cur.fetchone()
+
+        cur.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        job_status = dict(cur.fetchall())
+
+        cur.execute("""
+            SELECT COUNT(*), COALESCE(SUM(created_at >= date('now', '-7 days')), 0)
+            FROM promotions
+        """)
+        total_promotions, weekly_promotions = cur.fetchone()
+
+    return {
+        "total_users": total_users,
+        "total_points": total_points,
+        "top_user": {"username": top_user[0], "points": top_user[1]} if top_user else None,
+        "total_jobs": sum(job_status.values()),
+        "job_status": job_status,
+        "total_promotions": total_promotions,
+        "weekly_promotions": weekly_promotions,
+    }
+
+def get_db_file_sizes():
+    """Size in bytes of the database file and its -wal/-shm files (0 if missing)"""
+    sizes = {}
+    for name, suffix in (("db", ""), ("wal", "-wal"), ("shm", "-shm")):
+        try:
+            sizes[name] = Path(DB_FILE + suffix).stat().st_size
+        except OSError:
+            sizes[name] = 0
+    return sizes
+
+def get_write_queue_depth():
+    """Writes queued for the batched writer and not yet committed"""
+    return _write_queue.qsize()
+
+# ==== COUNTER FUNCTIONS ====
+
+def get_counters(readonly=True):
+    """Persisted dashboard counters as {name: value}"""
+    with _conn(readonly) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT name, value FROM dashboard_counters")
+        return dict(cur.fetchall())
+
+def save_counters(counters):
+    """Queue an absolute snapshot of {name: value} counters"""
+    for name, value in counters.items():
+        enqueue_write("""
+            INSERT INTO dashboard_counters (name, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+        """, (name, int(value)))
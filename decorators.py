@@ -32,10 +32,10 @@ def registered_only(func):
     """Decorator to restrict commands to registered users only"""
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
-        from db import get_user_by_id
+        from async_db import get_user_by_id
         
         user_id = str(update.effective_user.id)
-        user_data = get_user_by_id(user_id)
+        user_data = await get_user_by_id(user_id)
         
         if not user_data:
             await update.message.reply_text(
@@ -0,0 +1,203 @@
+import re
+
+# Known NexoBuzz community questions, answered locally by NexoAi.
+# match_faq() looks the question up in an inverted keyword index:
+# - high confidence (the question is only about one topic): answer locally
+# - lower confidence: the topic's context is added to the Gemini prompt
+# Open-ended questions that match nothing go to Gemini as they are.
+
+FAQ_MIN_CONFIDENCE = 0.75  # share of the question's content words an entry must cover
+FAQ_GENERIC_CONFIDENCE = 0.5  # cap when only generic keywords matched and no intent word was asked
+
+# keywords identify the topic; context words may appear without lowering the confidence.
+# generic keywords (also listed in keywords) are common words like "admin": matched
+# alone they only add context, unless the question also has one of the intent words.
+# requires: words the question must contain to be answered locally (e.g. whose number).
+FAQ_ENTRIES = (
+    {
+        "id": "nexobuzz",
+        "keywords": ("nexobuzz", "nexo"),
+        "context": ("buzz", "platform", "grup", "komunitas"),
+        "answer": (
+            "*NexoBuzz* adalah platform/komunitas untuk dapetin penghasilan lewat aktivitas "
+            "buzzer dan influencer, misalnya like, comment, follow, review, dan lain-lain.\n\n"
+            "Job baru diumumkan di grup, tinggal apply lewat bot. Udah paham belum? "
+            "Mau aku jelasin cara daftar atau cara ambil job?"
+        ),
+        "facts": "NexoBuzz adalah platform untuk mendapatkan penghasilan melalui aktivitas buzzer dan influencer (like, comment, follow, review, dll).",
+    },
+    {
+        "id": "handle",
+        "keywords": ("handle", "handler"),
+        "context": ("isi", "diisi", "ngisi", "kolom", "nexobuzz", "job"),
+        "answer": (
+            "*Handle* itu grup atau komunitas yang ngehandle job (seperti NexoBuzz).\n\n"
+            "Kalau ada kolom handle waktu ambil job, cukup isi dengan *Nexo* aja. "
+            "Udah paham? Ada kolom lain yang bikin bingung?"
+        ),
+        "facts": "Handle adalah grup/komunitas yang ngehandle job (seperti NexoBuzz); di NexoBuzz kolom handle cukup diisi \"Nexo\".",
+    },
+    {
+        "id": "talent",
+        "keywords": ("talent",),
+        "context": ("nama", "isi", "diisi", "ngisi", "kolom", "job"),
+        "answer": (
+            "*Nama talent* adalah nama member yang ngerjain job, dalam hal ini kamu sendiri.\n\n"
+            "Nama talent sama dengan *username* yang kamu daftarkan di NexoBuzz, jadi setiap "
+            "pengisian nama atau nama talent, isi dengan username kamu ya. Udah jelas?"
+        ),
+        "facts": "Nama talent adalah nama member yang mengerjakan job, sama dengan username yang didaftarkan di NexoBuzz.",
+    },
+    {
+        "id": "username",
+        "keywords": ("username",),
+        "context": ("nama", "isi", "diisi", "ngisi", "fungsi", "fungsinya", "guna", "gunanya", "job"),
+        "generic": ("username",),
+        "intent": ("apa", "maksud", "maksudnya", "arti", "artinya", "fungsi", "fungsinya", "guna", "gunanya",
+                   "isi", "diisi", "ngisi", "gimana", "bagaimana"),
+        "answer": (
+            "*Username* dipakai buat ngisi nama setiap kali ambil job. Jadi setiap pengisian "
+            "nama atau username, isi dengan username yang kamu daftarkan di NexoBuzz.\n\n"
+            "Lupa username kamu? Cek pakai `/myinfo`."
+        ),
+        "facts": "Username dipakai untuk mengisi nama setiap ambil job; isi dengan username yang didaftarkan di NexoBuzz.",
+    },
+    {
+        "id": "owner",
+        "keywords": ("owner", "pemilik", "founder", "pendiri"),
+        "context": ("grup", "nexobuzz", "nexo", "punya"),
+        # "owner"/"pemilik" also mean the account owner in /register
+        "generic": ("owner", "pemilik"),
+        "intent": ("siapa", "grup", "nexobuzz", "nexo"),
+        "answer": "Owner grup NexoBuzz adalah @Wafaqih. Ada yang mau ditanyain lagi?",
+        "facts": "Owner grup NexoBuzz adalah @Wafaqih.",
+    },
+    {
+        "id": "admin_wa",
+        "keywords": ("wa", "whatsapp", "kontak", "hubungi", "nomor", "admin"),
+        "context": ("no", "hp", "minta", "grup", "nexobuzz", "nexo"),
+        "generic": ("kontak", "hubungi", "nomor", "admin"),
+        "intent": ("berapa", "minta", "cara", "no", "hp", "hubungi", "kontak", "nomor"),
+        # "wa kamu berapa" asks for someone else's number
+        "requires": ("admin",),
+        "answer": "Nomor WA admin grup NexoBuzz: *082119299186*. Ada lagi yang bisa aku bantu?",
+        "facts": "Nomor WA admin grup NexoBuzz adalah 082119299186.",
+    },
+    {
+        "id": "mg",
+        "keywords": ("mg", "management", "manajemen"),
+        "context": ("buzzer", "buzzeran", "perbuzzeran"),
+        "answer": (
+            "*MG* itu singkatan dari *Management*. Dalam dunia per-buzzeran, MG ya komunitas "
+            "yang ngelola job seperti NexoBuzz.\n\nUdah paham? Mau tau juga soal ER atau handle?"
+        ),
+        "facts": "MG adalah singkatan dari Management; dalam per-buzzeran, MG adalah komunitas seperti NexoBuzz.",
+    },
+    {
+        "id": "er",
+        "keywords": ("er", "engagement"),
+        "context": ("rate", "cek", "hitung", "menghitung", "akun"),
+        "answer": (
+            "*ER* itu singkatan dari *Engagement Rate*, yaitu persentase follower yang "
+            "berinteraksi (like, komen, share, dll) dibanding total follower.\n\n"
+            "Rumus gampangnya: (like + komen) / jumlah follower x 100%.\n\n"
+            "Buat cek ER bisa pakai https://www.buzzsumo.com/ atau https://www.hootsuite.com/. "
+            "Udah paham? Mau aku bantu hitung ER akun kamu?"
+        ),
+        "facts": "ER adalah Engagement Rate: persentase follower yang berinteraksi (like, komen, dll) dibanding total follower. Situs cek ER: https://www.buzzsumo.com/ dan https://www.hootsuite.com/.",
+    },
+    {
+        "id": "tiers",
+        "keywords": ("nano", "micro", "mikro", "macro", "makro", "mega", "tier", "tingkatan"),
+        "context": ("influencer", "kategori", "followers", "follower", "beda", "bedanya", "perbedaan"),
+        "answer": (
+            "Nano, micro, macro, dan mega itu *kategori tier influencer* berdasarkan jumlah followers:\n\n"
+            "• *Nano*: 1K - 10K followers, audiens kecil tapi engagement biasanya paling tinggi\n"
+            "• *Micro*: 10K - 100K followers, niche jelas dan dipercaya audiensnya\n"
+            "• *Macro*: 100K - 1 juta followers, jangkauan luas\n"
+            "• *Mega*: di atas 1 juta followers, biasanya selebriti/public figure\n\n"
+            "Udah paham? Akun kamu masuk tier yang mana nih?"
+        ),
+        "facts": "Tier influencer berdasarkan followers: nano 1K-10K, micro 10K-100K, macro 100K-1 juta, mega di atas 1 juta.",
+    },
+    {
+        "id": "influencer",
+        "keywords": ("influencer", "influencers"),
+        "context": ("jadi", "menjadi"),
+        "answer": (
+            "*Influencer* adalah orang yang punya pengaruh besar di suatu komunitas atau "
+            "platform sosial media, sehingga bisa memengaruhi pendapat atau keputusan followers-nya.\n\n"
+            "Udah paham? Mau tau juga soal tier nano, micro, macro, dan mega?"
+        ),
+        "facts": "Influencer adalah orang yang memiliki pengaruh besar dalam suatu komunitas atau platform sosial media.",
+    },
+)
+
+# Question words and fillers that say nothing about the topic
+_STOPWORDS = frozenset("""
+    apa apaan apakah itu ini sih yang adalah maksud maksudnya arti artinya dong kak kakak min mimin
+    gimana bagaimana siapa berapa ya jelaskan jelasin tentang dan di ke dari nya tuh tu deh kah nih
+    mau tanya nanya gan bang bro sis aku saya gw gue kamu untuk buat kalau kalo ada the is what who
+    nexoai bot tolong please pls
+""".split())
+
+_WORD = re.compile(r"\w+")
+
+def _tokens(text):
+    """Lower-case word tokens"""
+    return _WORD.findall(text.casefold())
+
+def _build_index():
+    """token -> [(entry index, kind)], kind being keyword, generic or context"""
+    index = {}
+    for i, entry in enumerate(FAQ_ENTRIES):
+        generic = entry.get("generic", ())
+        for word in entry["keywords"]:
+            index.setdefault(word, []).append((i, "generic" if word in generic else "keyword"))
+        for word in entry["context"]:
+            index.setdefault(word, []).append((i, "context"))
+    return index
+
+_INDEX = _build_index()
+
+def _lookup(token):
+    """Index postings for a token, also trying it without the -nya suffix"""
+    postings = _INDEX.get(token)
+    if postings is None and token.endswith("nya") and len(token) > 5:
+        postings = _INDEX.get(token[:-3])
+    return postings or ()
+
+def match_faq(text):
+    """Best FAQ entry for a question and its confidence (0..1), or (None, 0.0)"""
+    tokens = _tokens(text)
+    content = [t for t in tokens if t not in _STOPWORDS]
+    if not content:
+        return None, 0.0
+
+    covered = {}   # entry index -> content tokens it covers
+    keywords = {}  # entry index -> keyword hits (generic included)
+    specific = {}  # entry index -> non-generic keyword hits
+    for token in content:
+        for i, kind in _lookup(token):
+            covered[i] = covered.get(i, 0) + 1
+            if kind != "context":
+                keywords[i] = keywords.get(i, 0) + 1
+            if kind == "keyword":
+                specific[i] = specific.get(i, 0) + 1
+    if not keywords:
+        return None, 0.0
+
+    # Highest coverage wins, then more keyword hits, then FAQ order
+    best = max(keywords, key=lambda i: (covered[i], keywords[i], -i))
+    entry = FAQ_ENTRIES[best]
+    confidence = covered[best] / len(content)
+    present = set(tokens)
+    generic_only = best not in specific and not present & set(entry.get("intent", ()))
+    if generic_only or not present.issuperset(entry.get("requires", ())):
+        # e.g. "admin", "username kamu siapa", "wa kamu berapa": not clearly asking this FAQ
+        confidence = min(confidence, FAQ_GENERIC_CONFIDENCE)
+    return entry, confidence
+
+def faq_context(entry):
+    """Facts for the Gemini prompt when an entry matched with low confidence"""
+    return f"[Info NexoBuzz yang relevan: {entry['facts']}]"
@@ -1,9 +1,10 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, ConversationHandler, MessageHandler, filters
 from decorators import admin_only
-from db import (
+from async_db import (
     add_job, get_all_jobs, get_job_by_id, add_applicant, get_applicants_by_job,
-    get_user_by_id, add_badge_to_user, has_badge, get_total_applies, add_points_to_user, get_conn
+    get_user_by_id, get_users_by_ids, add_badge_to_user, has_badge, get_total_applies, add_points_to_user,
+    update_job_status, delete_job, delete_all_jobs
 )
 from dashboard import log_activity
 from utils import sanitize_input, get_user_display_name, GROUP_ID, BUZZER_TOPIC_ID, INFLUENCER_TOPIC_ID, PAYMENT_TOPIC_ID
@@ -119,7 +120,7 @@ async def postjob_topic_selection(update: Update, context: ContextTypes.DEFAULT_
             return ConversationHandler.END
 
         # Create job in database
-        job_id = add_job(title, fee, desc, status="aktif")
+        job_id = await add_job(title, fee, desc, status="aktif")
 
         # Create job post message
         job_text = (
@@ -208,7 +209,7 @@ async def updatejob_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         job_id, status = context.args[0], context.args[1].lower()
 
         # Validate job exists
-        job = get_job_by_id(job_id)
+        job = await get_job_by_id(job_id)
         if not job:
             await update.message.reply_text(f"❌ Job dengan ID {job_id} tidak ditemukan.")
             return
@@ -222,13 +223,7 @@ async def updatejob_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # Update status in database
-        with get_conn() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                "UPDATE jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (status, job_id)
-            )
-            conn.commit()
+        await update_job_status(job_id, status)
 
         await update.message.reply_text(
             f"✅ *Job {job_id} Updated*\n\n"
@@ -281,33 +276,26 @@ async def resetjob_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         arg = context.args[0]
 
-        with get_conn() as conn:
-            cur = conn.cursor()
-
-            if arg.lower() == "all":
-                # Delete all jobs and applications
-                cur.execute("DELETE FROM applicants")
-                cur.execute("DELETE FROM jobs")
-                conn.commit()
+        if arg.lower() == "all":
+            # Delete all jobs and applications
+            await delete_all_jobs()
 
-                await update.message.reply_text("✅ Semua job dan aplikasi telah dihapus.")
-                log_activity("reset_jobs", str(update.effective_user.id), "All jobs deleted")
+            await update.message.reply_text("✅ Semua job dan aplikasi telah dihapus.")
+            log_activity("reset_jobs", str(update.effective_user.id), "All jobs deleted")
 
-            else:
-                # Delete specific job
-                job_id = arg
-                job = get_job_by_id(job_id)
+        else:
+            # Delete specific job
+            job_id = arg
+            job = await get_job_by_id(job_id)
 
-                if not job:
-                    await update.message.reply_text(f"❌ Job dengan ID {job_id} tidak ditemukan.")
-                    return
+            if not job:
+                await update.message.reply_text(f"❌ Job dengan ID {job_id} tidak ditemukan.")
+                return
 
-                cur.execute("DELETE FROM applicants WHERE job_id = ?", (job_id,))
-                cur.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
-                conn.commit()
+            await delete_job(job_id)
 
-                await update.message.reply_text(f"✅ Job {job_id} telah dihapus.")
-                log_activity("delete_job", str(update.effective_user.id), f"Job {job_id} deleted")
+            await update.message.reply_text(f"✅ Job {job_id} telah dihapus.")
+            log_activity("delete_job", str(update.effective_user.id), f"Job {job_id} deleted")
 
     except Exception as e:
         logger.error(f"Failed to reset jobs: {e}")
@@ -327,13 +315,13 @@ async def pelamarjob_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     try:
         job_id = context.args[0]
-        job = get_job_by_id(job_id)
+        job = await get_job_by_id(job_id)
 
         if not job:
             await update.message.reply_text(f"❌ Job dengan ID {job_id} tidak ditemukan.")
             return
 
-        applicants = get_applicants_by_job(job_id)
+        applicants = await get_applicants_by_job(job_id)
 
         if not applicants:
             await update.message.reply_text(
@@ -349,8 +337,9 @@ async def pelamarjob_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         text += f"🟢 **Status:** {job['status']}\n\n"
         text += f"👥 **Total Pelamar:** {len(applicants)} orang\n\n"
 
+        users = await get_users_by_ids(applicants)
         for i, user_id in enumerate(applicants, start=1):
-            user = get_user_by_id(user_id)
+            user = users.get(user_id)
             if user:
                 username = user['username']
                 text += f"{i}. {username}\n"
@@ -368,7 +357,7 @@ async def pelamarjob_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def listjob_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all available jobs"""
     try:
-        jobs = get_all_jobs()
+        jobs = await get_all_jobs()
 
         if not jobs:
             await update.message.reply_text(
@@ -420,14 +409,14 @@ async def infojob_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         job_id = context.args[0]
-        job = get_job_by_id(job_id)
+        job = await get_job_by_id(job_id)
 
         if not job:
             await update.message.reply_text(f"❌ Job dengan ID {job_id} tidak ditemukan.")
             return
 
         # Get applicant count
-        applicants = get_applicants_by_job(job_id)
+        applicants = await get_applicants_by_job(job_id)
         applicant_count = len(applicants)
 
         # Status emoji
@@ -486,7 +475,7 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         # Check if user is registered
-        user_data = get_user_by_id(user_id)
+        user_data = await get_user_by_id(user_id)
         if not user_data:
             try:
                 await context.bot.send_message(
@@ -504,7 +493,7 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Extract job ID from callback data
         job_id = query.data.split("_")[1]
-        job = get_job_by_id(job_id)
+        job = await get_job_by_id(job_id)
 
         if not job:
             try:
@@ -528,7 +517,7 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # Check if user already applied
-        applicants = get_applicants_by_job(job_id)
+        applicants = await get_applicants_by_job(job_id)
         if user_id in applicants:
             try:
                 await context.bot.send_message(
@@ -545,14 +534,14 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # Add user as applicant
-        add_applicant(job_id, user_id)
+        await add_applicant(job_id, user_id)
 
         # Check and award achievement badges
-        total_applies = get_total_applies(user_id)
+        total_applies = await get_total_applies(user_id)
 
         # Badge: Rising Star (first apply)
-        if total_applies == 1 and not has_badge(user_id, "🚀 Rising Star"):
-            add_badge_to_user(user_id, "🚀 Rising Star")
+        if total_applies == 1 and not await has_badge(user_id, "🚀 Rising Star"):
+            await add_badge_to_user(user_id, "🚀 Rising Star")
             try:
                 await context.bot.send_message(
                     chat_id=user_id,
@@ -563,8 +552,8 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 pass
 
         # Badge: Member Aktif (10 applies)
-        if total_applies >= 10 and not has_badge(user_id, "🎯 Member Aktif"):
-            add_badge_to_user(user_id, "🎯 Member Aktif")
+        if total_applies >= 10 and not await has_badge(user_id, "🎯 Member Aktif"):
+            await add_badge_to_user(user_id, "🎯 Member Aktif")
             try:
                 await context.bot.send_message(
                     chat_id=user_id,
@@ -575,8 +564,8 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 pass
 
         # Badge: Worker Pro (50 applies)
-        if total_applies >= 50 and not has_badge(user_id, "💼 Worker Pro"):
-            add_badge_to_user(user_id, "💼 Worker Pro")
+        if total_applies >= 50 and not await has_badge(user_id, "💼 Worker Pro"):
+            await add_badge_to_user(user_id, "💼 Worker Pro")
             try:
                 await context.bot.send_message(
                     chat_id=user_id,
@@ -587,7 +576,7 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 pass
 
         # Get updated applicant list and position
-        updated_applicants = get_applicants_by_job(job_id)
+        updated_applicants = await get_applicants_by_job(job_id)
         user_position = updated_applicants.index(user_id) + 1
         total_applicants = len(updated_applicants)
 
@@ -604,8 +593,9 @@ async def apply_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
 
             # Show top 10 applicants
+            top_applicants = await get_users_by_ids(updated_applicants[:10])
             for i, applicant_id in enumerate(updated_applicants[:10], 1):
-                applicant = get_user_by_id(applicant_id)
+                applicant = top_applicants.get(applicant_id)
                 if applicant:
                     username = applicant['username']
                     if applicant_id == user_id:
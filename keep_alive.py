@@ -1,5 +1,4 @@
-from flask import Flask, jsonify, redirect
-from threading import Thread
+from flask import Flask, jsonify, request, Response
 import time
 import os
 import logging
@@ -17,11 +16,6 @@ bot_status = {
     "version": "2.0.0"
 }
 
-# Redirect root ke dashboard utama
-@app.route('/')
-def home():
-    return redirect("http://0.0.0.0:5000/")  # arahkan ke dashboard.py
-
 @app.route('/health')
 def health():
     """Health check endpoint for monitoring services"""
@@ -91,23 +85,27 @@ def ping():
 
 @app.route('/metrics')
 def metrics():
-    """Basic metrics endpoint"""
+    """Process, event loop and database metrics (JSON, or ?format=prometheus)"""
+    from metrics import collect_metrics, format_prometheus
+
     current_time = time.time()
     uptime = current_time - bot_start_time
+    collected = collect_metrics()
 
-    try:
-        from db import get_all_users, get_all_jobs
-        users_count = len(get_all_users())
-        jobs_count = len(get_all_jobs())
-    except:
-        users_count = 0
-        jobs_count = 0
+    if request.args.get("format") == "prometheus":
+        return Response(
+            format_prometheus(collected, uptime),
+            content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
 
+    database = collected["database"] or {}
+    rss = collected["process"]["rss_bytes"]
     metrics = {
         "uptime_seconds": round(uptime, 2),
-        "total_users": users_count,
-        "total_jobs": jobs_count,
-        "memory_usage": "N/A",  # Bisa pakai psutil kalau mau lebih detail
+        "total_users": database.get("users", 0),
+        "total_jobs": database.get("jobs", 0),
+        "memory_usage": f"{rss / (1024 * 1024):.1f} MB" if rss is not None else "N/A",
+        **collected,
         "last_updated": current_time
     }
 
@@ -118,7 +116,7 @@ def not_found(error):
     return jsonify({
         "error": "Not Found",
         "message": "The requested endpoint does not exist",
-        "available_endpoints": ["/", "/health", "/status", "/ping", "/metrics"]
+        "available_endpoints": ["/health", "/status", "/ping", "/metrics"]
     }), 404
 
 @app.errorhandler(500)
@@ -128,27 +126,3 @@ def internal_error(error):
         "message": "Something went wrong on our end",
         "status": "error"
     }), 500
-
-def run():
-    """Run the Flask keep-alive server"""
-    try:
-        app.run(host="0.0.0.0", port=8080, debug=False, use_reloader=False)
-    except Exception as e:
-        logger.error(f"Keep-alive server failed to start: {e}")
-
-def keep_alive():
-    """Start the keep-alive server in a daemon thread"""
-    try:
-        t = Thread(target=run, daemon=True)
-        t.start()
-
-        logger.info("Keep-alive server started successfully")
-        print("🌐 Keep-alive server started on http://0.0.0.0:8080")
-        print("📊 Health check available at: /health")
-        print("📈 Status endpoint available at: /status") 
-        print("🏓 Ping endpoint available at: /ping")
-        print("📊 Metrics available at: /metrics")
-
-    except Exception as e:
-        logger.error(f"Failed to start keep-alive server: {e}")
-        print(f"❌ Failed to start keep-alive server: {e}")
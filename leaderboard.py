@@ -1,18 +1,28 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from db import (
+from async_db import (
     get_all_users, get_user_by_id, get_referrals_by_username, 
-    add_badge_to_user, has_badge, get_badges
+    add_badge_to_user, has_badge, get_badges, flush_writes
 )
 from utils import format_currency
 import logging
 
 logger = logging.getLogger(__name__)
 
+POINTS_FLUSH_TIMEOUT = 2.0  # seconds to wait for pending point rewards before reading anyway
+
+async def _flush_pending_points():
+    """Wait (bounded) for batched point rewards so the read below includes them"""
+    if not await flush_writes(timeout=POINTS_FLUSH_TIMEOUT):
+        # Writer stuck or dead: serve what is committed rather than hang the command
+        logger.warning(f"Pending writes not committed within {POINTS_FLUSH_TIMEOUT}s, reading without them")
+
 async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show leaderboard with top members"""
     try:
-        users = get_all_users()
+        # Point rewards are written in batches; make pending ones visible first
+        await _flush_pending_points()
+        users = await get_all_users()
         
         if not users:
             await update.message.reply_text(
@@ -25,7 +35,7 @@ async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         # Calculate additional stats for each user
         enhanced_users = []
         for user in users:
-            referrals = get_referrals_by_username(user['username'])
+            referrals = await get_referrals_by_username(user['username'])
             referral_count = len(referrals)
             user['referral_count'] = referral_count
             enhanced_users.append(user)
@@ -39,8 +49,8 @@ async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         # Award Top Contributor badge to #1 in points
         if top_points and top_points[0].get('points', 0) > 0:
             top_user = top_points[0]
-            if not has_badge(top_user['user_id'], "🏆 Top Contributor"):
-                add_badge_to_user(top_user['user_id'], "🏆 Top Contributor")
+            if not await has_badge(top_user['user_id'], "🏆 Top Contributor"):
+                await add_badge_to_user(top_user['user_id'], "🏆 Top Contributor")
                 try:
                     await context.bot.send_message(
                         chat_id=top_user['user_id'],
@@ -58,7 +68,7 @@ async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         if top_points:
             for i, user in enumerate(top_points, start=1):
                 points = user.get('points', 0)
-                badges = get_badges(user['user_id'])
+                badges = await get_badges(user['user_id'])
                 badge_display = badges[0] if badges else ""
                 
                 # Medal emojis for top 3
@@ -108,7 +118,8 @@ async def points_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user's current points and earning information"""
     try:
         user_id = str(update.effective_user.id)
-        user_data = get_user_by_id(user_id)
+        await _flush_pending_points()
+        user_data = await get_user_by_id(user_id)
         
         if not user_data:
             await update.message.reply_text(
@@ -121,15 +132,15 @@ async def points_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Get user stats
         points = user_data.get('points', 0)
         username = user_data['username']
-        referrals = get_referrals_by_username(username)
+        referrals = await get_referrals_by_username(username)
         referral_count = len(referrals)
-        badges = get_badges(user_id)
+        badges = await get_badges(user_id)
         
         # Calculate referral points
         referral_points = referral_count * 25
         
         # Get user ranking
-        all_users = get_all_users()
+        all_users = await get_all_users()
         sorted_users = sorted(all_users, key=lambda x: x.get('points', 0), reverse=True)
         user_rank = next((i + 1 for i, user in enumerate(sorted_users) if user['user_id'] == user_id), "N/A")
         
@@ -156,9 +167,9 @@ async def points_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             msg += f"• Kumpulkan {100 - points} poin lagi untuk mencapai 100 poin\n"
         if referral_count < 5:
             msg += f"• Ajak {5 - referral_count} teman lagi untuk 5 referral\n"
-        if not has_badge(user_id, "🎯 Member Aktif"):
-            from db import get_total_applies
-            applies = get_total_applies(user_id)
+        if not await has_badge(user_id, "🎯 Member Aktif"):
+            from async_db import get_total_applies
+            applies = await get_total_applies(user_id)
             if applies < 10:
                 msg += f"• Apply {10 - applies} job lagi untuk badge Member Aktif\n"
         
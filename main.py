@@ -1,6 +1,9 @@
-from db import init_db
-from keep_alive import keep_alive
-from dashboard import start_dashboard, log_activity
+from db import init_db, close_all_connections
+from async_db import shutdown as shutdown_db_executor
+from server import start_http_server
+from dashboard import log_activity, persist_dashboard_state
+from maintenance import retention_job, RETENTION_INTERVAL
+from metrics import start_loop_monitor
 import logging
 from telegram.ext import (
     Application, CommandHandler, MessageHandler,
@@ -36,6 +39,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def _post_init(application):
+    """Runs on the bot's event loop before polling starts"""
+    # Event loop lag for /metrics
+    start_loop_monitor()
+
 def main():
     """Main function to initialize and run the bot"""
     try:
@@ -49,7 +57,7 @@ def main():
 
         # Create application with JobQueue
         from telegram.ext import JobQueue
-        application = Application.builder().token(BOT_TOKEN).job_queue(JobQueue()).build()
+        application = Application.builder().token(BOT_TOKEN).job_queue(JobQueue()).post_init(_post_init).build()
 
         # Conversation handler untuk register
         conv_handler = ConversationHandler(
@@ -139,17 +147,18 @@ def main():
         application.add_handler(MessageHandler(filters.TEXT & filters.Regex(r'^\..+'), hidden_tag_handler))
 
         # AI Features
+        # block=False: a Gemini call in flight does not hold up the next updates
         application.add_handler(CommandHandler("startai", start_ai_chat))
         application.add_handler(CommandHandler("stopai", stop_ai_chat))
-        application.add_handler(CommandHandler("ai", chat_with_ai))
+        application.add_handler(CommandHandler("ai", chat_with_ai, block=False))
 
         # AI di private chat: interaktif TANPA /ai
         application.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND & filters.ChatType.PRIVATE, chat_with_ai)
+            MessageHandler(filters.TEXT & ~filters.COMMAND & filters.ChatType.PRIVATE, chat_with_ai, block=False)
         )
 
         # Summary dan group activity
-        application.add_handler(CommandHandler("summary", summary_command))
+        application.add_handler(CommandHandler("summary", summary_command, block=False))
         application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, save_group_messages))
         application.add_handler(MessageHandler(filters.TEXT & filters.ChatType.GROUPS & ~filters.COMMAND, group_activity_points))
 
@@ -170,19 +179,23 @@ def main():
         application.add_handler(CommandHandler("addpoint", addpoint_command))
 
 
-        # Start services
-        keep_alive()
-        print("🌐 Keep-alive server started on port 8080")
-
-        start_dashboard()
-        print("📊 Dashboard server started on port 5000")
+        # Start services (dashboard + keep-alive on one HTTP server, ports 5000 and 8080)
+        start_http_server()
         print("🔍 Debug info available at: http://0.0.0.0:5000/debug")
 
         print("🤖 Bot is starting...")
         log_activity("bot_start", description="Bot started successfully")
 
+        # Retention/archival and incremental vacuum, off the hot path
+        application.job_queue.run_repeating(
+            retention_job, interval=RETENTION_INTERVAL, first=300, name="db-maintenance"
+        )
+
         # Run the bot
         application.run_polling(drop_pending_updates=True)
+        persist_dashboard_state()
+        shutdown_db_executor()
+        close_all_connections()
 
     except Exception as e:
         logger.error(f"Failed to start bot: {e}")
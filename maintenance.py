@@ -0,0 +1,226 @@
+import argparse
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Offline/ops maintenance tasks for the bot database.
+# Safe to run while the bot is up: each task works in short write transactions.
+
+def _env_int(name, default):
+    """Integer setting from the environment"""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        logger.warning(f"{name} is not a valid integer, defaulting to {default}")
+        return default
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+RETENTION_BATCH_SIZE = 2000  # rows archived and deleted per transaction
+RETENTION_INTERVAL = _env_int("RETENTION_INTERVAL_SECONDS", 6 * 3600)  # JobQueue interval
+VACUUM_PAGES_PER_RUN = 5000  # free pages returned to the OS per incremental vacuum
+
+# table -> (timestamp column, columns identifying an archived row, retention days)
+# Retention days <= 0 keeps the table forever.
+RETENTION_POLICIES = {
+    "activity_logs": (
+        "timestamp", ("id",), _env_int("ACTIVITY_LOG_RETENTION_DAYS", 90)
+    ),
+    # seq is part of the key so a slot overwritten by a new message is never deleted
+    "group_message_ring": (
+        "timestamp", ("chat_id", "slot", "seq"), _env_int("GROUP_MESSAGE_RETENTION_DAYS", 30)
+    ),
+}
+
+# ==== ACTIVITY ROLLUPS ====
+
+# Recomputed counts replace the stored ones, except in the oldest bucket that
+# still has raw rows: retention may have archived part of it already, so there
+# the count can only go up
+_BACKFILL_UPSERT = """
+    INSERT INTO {table} (bucket, action_type, count)
+    SELECT {bucket}, action_type, COUNT(*)
+    FROM activity_logs WHERE timestamp >= ? GROUP BY 1, 2
+    ON CONFLICT (bucket, action_type) DO UPDATE SET count = CASE
+        WHEN excluded.bucket <= ? THEN MAX(count, excluded.count)
+        ELSE excluded.count
+    END
+"""
+
+def backfill_rollups(conn, since=None):
+    """Recompute activity rollups from activity_logs (from date `since`, or all history)"""
+    # Buckets whose raw rows are all archived get no recomputed count and are left as they are
+    try:
+        # BEGIN IMMEDIATE blocks the bot's writer for the duration, so no
+        # increment can land between reading the log and writing the counts
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.cursor()
+        oldest = cur.execute("SELECT MIN(timestamp) FROM activity_logs").fetchone()[0]
+        if oldest is None:
+            conn.commit()
+            logger.info("Rollups rebuilt: activity_logs is empty")
+            return 0, 0
+        cur.execute(_BACKFILL_UPSERT.format(
+            table="activity_rollup_hourly", bucket="strftime('%Y-%m-%d %H:00:00', timestamp)"
+        ), (since or "", oldest[:13] + ":00:00"))
+        hourly = cur.rowcount
+        cur.execute(_BACKFILL_UPSERT.format(
+            table="activity_rollup_daily", bucket="date(timestamp)"
+        ), (since or "", oldest[:10]))
+        daily = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info(f"Rollups rebuilt: {hourly} hourly and {daily} daily buckets")
+    return hourly, daily
+
+# ==== RETENTION ====
+
+def _append_archive(path, records):
+    """Append records to a gzip NDJSON file and fsync it"""
+    # Each call adds one gzip member; gzip readers see a single stream
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+            for record in records:
+                gz.write((json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+def archive_expired(conn, table, days, archive_dir=ARCHIVE_DIR, batch_size=RETENTION_BATCH_SIZE):
+    """Move rows older than `days` from table to archive/<table>-<date>.ndjson.gz"""
+    ts_column, key_columns, _ = RETENTION_POLICIES[table]
+    now = datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    Path(archive_dir).mkdir(parents=True, exist_ok=True)
+    path = Path(archive_dir) / f"{table}-{now:%Y%m%d}.ndjson.gz"
+    delete_sql = f"DELETE FROM {table} WHERE " + " AND ".join(f"{c} = ?" for c in key_columns)
+
+    archived = 0
+    while True:
+        cur = conn.execute(
+            f"SELECT * FROM {table} WHERE {ts_column} < ? ORDER BY {ts_column} LIMIT ?",
+            (cutoff, batch_size)
+        )
+        columns = [d[0] for d in cur.description]
+        records = [dict(zip(columns, row)) for row in cur.fetchall()]
+        if not records:
+            break
+
+        # Archive before deleting: a crash in between only duplicates archive lines
+        _append_archive(path, records)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(delete_sql, [tuple(r[c] for c in key_columns) for r in records])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        archived += len(records)
+        if len(records) < batch_size:
+            break
+
+    if archived:
+        logger.info(f"Archived {archived} rows from {table} older than {days} days to {path}")
+    return archived
+
+def run_retention(conn, archive_dir=ARCHIVE_DIR):
+    """Apply every retention policy; returns {table: rows archived}"""
+    result = {}
+    for table, (_, _, days) in RETENTION_POLICIES.items():
+        if days <= 0:
+            continue
+        result[table] = archive_expired(conn, table, days, archive_dir=archive_dir)
+    return result
+
+# ==== COMPACTION ====
+
+def incremental_vacuum(conn, pages=VACUUM_PAGES_PER_RUN):
+    """Return up to `pages` free pages to the OS (needs auto_vacuum=INCREMENTAL)"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        logger.debug("auto_vacuum is not INCREMENTAL, run 'maintenance.py enable-auto-vacuum' once")
+        return 0
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    # executescript steps the pragma to completion; execute() would free one page
+    conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+    freed = before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if freed:
+        logger.info(f"Incremental vacuum freed {freed} pages")
+    return freed
+
+def enable_auto_vacuum(conn):
+    """One-time switch of an existing database to auto_vacuum=INCREMENTAL (full VACUUM)"""
+    # VACUUM rewrites the whole file and needs an exclusive lock: stop the bot first
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+# ==== SCHEDULED JOB ====
+
+def run_scheduled_maintenance():
+    """Retention + incremental vacuum on a pooled connection (blocking)"""
+    from db import get_conn
+
+    with get_conn() as conn:
+        archived = run_retention(conn)
+        freed = incremental_vacuum(conn)
+    return archived, freed
+
+async def retention_job(context):
+    """PTB JobQueue callback: run maintenance on the database executor"""
+    from async_db import run_db
+
+    try:
+        archived, freed = await run_db(run_scheduled_maintenance)
+        logger.info(f"Scheduled maintenance done: archived={archived}, freed_pages={freed}")
+    except Exception as e:
+        logger.error(f"Scheduled maintenance failed: {e}")
+
+# ==== CLI ====
+
+def main(argv=None):
+    """Run a maintenance task against the database"""
+    parser = argparse.ArgumentParser(description="NexoBot database maintenance")
+    parser.add_argument("--db", default="database.db", help="database file (default: database.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    backfill = sub.add_parser("backfill-rollups", help="rebuild activity rollups from activity_logs")
+    backfill.add_argument("--since", default=None, help="only buckets from this UTC date (YYYY-MM-DD)")
+
+    retention = sub.add_parser("retention", help="archive and delete rows past their retention window")
+    retention.add_argument("--archive-dir", default=ARCHIVE_DIR, help=f"archive directory (default: {ARCHIVE_DIR})")
+
+    vacuum = sub.add_parser("vacuum", help="incremental vacuum of free pages")
+    vacuum.add_argument("--pages", type=int, default=VACUUM_PAGES_PER_RUN, help="max pages to free")
+
+    sub.add_parser("enable-auto-vacuum", help="one-time switch to auto_vacuum=INCREMENTAL (stop the bot first)")
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    try:
+        if args.command == "backfill-rollups":
+            hourly, daily = backfill_rollups(conn, since=args.since)
+            print(f"Rebuilt {hourly} hourly and {daily} daily rollup buckets")
+        elif args.command == "retention":
+            for table, count in run_retention(conn, archive_dir=args.archive_dir).items():
+                print(f"{table}: archived {count} rows")
+        elif args.command == "vacuum":
+            print(f"Freed {incremental_vacuum(conn, args.pages)} pages")
+        elif args.command == "enable-auto-vacuum":
+            ok = enable_auto_vacuum(conn)
+            print("auto_vacuum is now INCREMENTAL" if ok else "Failed to enable auto_vacuum")
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import asyncio
+import collections
+import logging
+import os
+import resource
+import sys
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Process, event loop and database metrics for keep_alive /metrics.
+# Everything is read from /proc, file sizes, COUNT(*) on indexed tables
+# (cached for a few seconds) and in-memory counters, so a scrape stays cheap
+# at any frequency. No third-party dependencies.
+
+METRICS_COUNTS_TTL = 10        # seconds the COUNT(*) results are reused between scrapes
+LOOP_LAG_INTERVAL = 0.5        # seconds between event loop lag probes
+LOOP_LAG_WINDOW = 120          # probes kept for the max (120 x 0.5s = last minute)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+_counts_cache = TTLCache(maxsize=1, ttl=METRICS_COUNTS_TTL)
+_loop_lag_samples = collections.deque(maxlen=LOOP_LAG_WINDOW)
+_loop_monitor_task = None
+
+# ==== PROCESS ====
+
+def read_process_metrics():
+    """RSS, CPU time, open fds and threads of this process (from /proc on Linux)"""
+    metrics = {
+        "rss_bytes": None,
+        "cpu_seconds": None,
+        "open_fds": None,
+        "max_fds": resource.getrlimit(resource.RLIMIT_NOFILE)[0],
+        "threads": None,
+    }
+    try:
+        with open("/proc/self/statm") as f:
+            metrics["rss_bytes"] = int(f.read().split()[1]) * _PAGE_SIZE
+
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        # The command name (field 2) may contain spaces; fields after it are fixed
+        fields = stat[stat.rindex(")") + 2:].split()
+        utime, stime = int(fields[11]), int(fields[12])
+        metrics["cpu_seconds"] = (utime + stime) / _CLK_TCK
+        metrics["threads"] = int(fields[17])
+
+        metrics["open_fds"] = len(os.listdir("/proc/self/fd"))
+    except (OSError, ValueError, IndexError) as e:
+        # Not Linux (or /proc hidden): CPU time is still available portably
+        logger.debug(f"/proc metrics unavailable: {e}")
+        if metrics["cpu_seconds"] is None:
+            t = os.times()
+            metrics["cpu_seconds"] = t.user + t.system
+    return metrics
+
+# ==== EVENT LOOP LAG ====
+
+async def _monitor_loop_lag(interval):
+    """Measure how late asyncio.sleep(interval) wakes up, forever"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        _loop_lag_samples.append(max(0.0, loop.time() - start - interval))
+
+def start_loop_monitor(interval=LOOP_LAG_INTERVAL):
+    """Start the lag probe on the running event loop (e.g. from PTB post_init)"""
+    global _loop_monitor_task
+    if _loop_monitor_task is None or _loop_monitor_task.done():
+        _loop_monitor_task = asyncio.get_running_loop().create_task(_monitor_loop_lag(interval))
+    return _loop_monitor_task
+
+def get_loop_lag():
+    """Latest and worst lag over the last LOOP_LAG_WINDOW probes, or None before the first probe"""
+    samples = list(_loop_lag_samples)
+    if not samples:
+        return None
+    return {"last_seconds": samples[-1], "max_seconds": max(samples)}
+
+# ==== DATABASE ====
+
+def _load_counts():
+    """Row counts from COUNT(*) on users and jobs"""
+    from db import count_users, count_jobs
+
+    return {"users": count_users(), "jobs": count_jobs()}
+
+def get_db_metrics():
+    """Database file sizes, writer backlog and cached row counts"""
+    from db import get_db_file_sizes, get_write_queue_depth
+
+    counts, _, _ = _counts_cache.get_or_load("counts", _load_counts)
+    return {
+        "file_bytes": get_db_file_sizes(),
+        "write_queue": get_write_queue_depth(),
+        **counts,
+    }
+
+# ==== COLLECT / FORMAT ====
+
+def collect_metrics():
+    """All metrics as a dict (see format_prometheus for the text form)"""
+    metrics = {
+        "process": read_process_metrics(),
+        "event_loop": get_loop_lag(),
+        "database": None,
+        "counters": None,
+        "ai_cache": None,
+    }
+    try:
+        metrics["database"] = get_db_metrics()
+    except Exception as e:
+        logger.error(f"Error collecting database metrics: {e}")
+    # Only when the bot loaded ai.py; the standalone HTTP server never does
+    ai = sys.modules.get("ai")
+    if ai is not None:
+        metrics["ai_cache"] = ai.get_response_cache_stats()
+    try:
+        from dashboard import get_counters_snapshot
+
+        metrics["counters"] = get_counters_snapshot()
+    except Exception as e:
+        logger.error(f"Error collecting dashboard counters: {e}")
+    return metrics
+
+def _prometheus_metric(lines, name, kind, help_text, samples):
+    """Append one metric family; samples is [(labels dict, value)]"""
+    samples = [(labels, value) for labels, value in samples if value is not None]
+    if not samples:
+        return
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+
+def format_prometheus(metrics, uptime_seconds):
+    """Prometheus text exposition (format 0.0.4) of collect_metrics()"""
+    lines = []
+    process = metrics["process"]
+    _prometheus_metric(lines, "nexobot_uptime_seconds", "gauge", "Seconds since the bot started.",
+                       [({}, round(uptime_seconds, 3))])
+    _prometheus_metric(lines, "process_resident_memory_bytes", "gauge", "Resident memory size in bytes.",
+                       [({}, process["rss_bytes"])])
+    _prometheus_metric(lines, "process_cpu_seconds_total", "counter", "User and system CPU time in seconds.",
+                       [({}, process["cpu_seconds"])])
+    _prometheus_metric(lines, "process_open_fds", "gauge", "Open file descriptors.",
+                       [({}, process["open_fds"])])
+    _prometheus_metric(lines, "process_max_fds", "gauge", "Maximum open file descriptors.",
+                       [({}, process["max_fds"])])
+    _prometheus_metric(lines, "process_threads", "gauge", "OS threads in the process.",
+                       [({}, process["threads"])])
+
+    lag = metrics["event_loop"]
+    if lag:
+        _prometheus_metric(lines, "nexobot_event_loop_lag_seconds", "gauge", "Latest asyncio event loop lag.",
+                           [({}, round(lag["last_seconds"], 6))])
+        _prometheus_metric(lines, "nexobot_event_loop_lag_max_seconds", "gauge",
+                           "Worst asyncio event loop lag over the last minute.",
+                           [({}, round(lag["max_seconds"], 6))])
+
+    database = metrics["database"]
+    if database:
+        _prometheus_metric(lines, "nexobot_db_file_bytes", "gauge", "SQLite database file sizes.",
+                           [({"file": name}, size) for name, size in database["file_bytes"].items()])
+        _prometheus_metric(lines, "nexobot_db_write_queue", "gauge", "Writes waiting for the batched writer.",
+                           [({}, database["write_queue"])])
+        _prometheus_metric(lines, "nexobot_users", "gauge", "Registered users.", [({}, database["users"])])
+        _prometheus_metric(lines, "nexobot_jobs", "gauge", "Jobs in the database.", [({}, database["jobs"])])
+
+    ai_cache = metrics["ai_cache"]
+    if ai_cache:
+        _prometheus_metric(lines, "nexobot_ai_cache_hits_total", "counter", "AI answers served from the cache.",
+                           [({}, ai_cache["hits"])])
+        _prometheus_metric(lines, "nexobot_ai_cache_misses_total", "counter", "Cacheable AI questions sent to Gemini.",
+                           [({}, ai_cache["misses"])])
+        _prometheus_metric(lines, "nexobot_ai_cache_entries", "gauge", "AI answers currently cached.",
+                           [({}, ai_cache["size"])])
+
+    counters = metrics["counters"]
+    if counters:
+        _prometheus_metric(lines, "nexobot_events_total", "counter", "Dashboard activity counters.",
+                           [({"counter": name}, value) for name, value in counters.items()])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,338 @@
+import argparse
+import logging
+import sqlite3
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Versioned schema migrations.
+# Each migration runs once, inside its own transaction, and is recorded in
+# schema_version. Never edit a migration that has shipped; append a new one.
+
+# ==== MIGRATIONS ====
+
+def _m001_baseline(cur):
+    """Original schema (safe to run on databases created before migrations)"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        user_id TEXT PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        whatsapp TEXT NOT NULL,
+        telegram TEXT NOT NULL,
+        payment_method TEXT NOT NULL,
+        payment_number TEXT NOT NULL,
+        owner_name TEXT NOT NULL,
+        referrer TEXT,
+        points INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        fee TEXT NOT NULL,
+        desc TEXT NOT NULL,
+        status TEXT DEFAULT 'aktif',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS applicants (
+        job_id INTEGER,
+        user_id TEXT,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (job_id, user_id),
+        FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE,
+        FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS achievements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        badge_name TEXT NOT NULL,
+        awarded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS activity_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        action_type TEXT NOT NULL,
+        user_id TEXT,
+        description TEXT,
+        FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE SET NULL
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS group_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chat_id TEXT NOT NULL,
+        user_id TEXT,
+        username TEXT,
+        message TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS promotions (
+        promo_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        link TEXT NOT NULL,
+        type TEXT NOT NULL,
+        followers TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_points ON users(points)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_applicants_job_id ON applicants(job_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_applicants_user_id ON applicants(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_achievements_user_id ON achievements(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_logs_user_id ON activity_logs(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_logs_timestamp ON activity_logs(timestamp)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_promotions_user_id ON promotions(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_promotions_created_at ON promotions(created_at)")
+
+def _m002_group_message_ring(cur):
+    """Replace group_messages with a fixed-size ring per chat (100 slots)"""
+    # seq is a per-chat message counter, slot = seq % 100, so each new
+    # message overwrites the oldest one in place
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS group_message_ring (
+        chat_id TEXT NOT NULL,
+        slot INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        user_id TEXT,
+        username TEXT,
+        message TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (chat_id, slot)
+    ) WITHOUT ROWID
+    """)
+
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'group_messages'")
+    if cur.fetchone():
+        cur.execute("""
+            INSERT OR REPLACE INTO group_message_ring
+                (chat_id, slot, seq, user_id, username, message, timestamp)
+            SELECT chat_id, seq % 100, seq, user_id, username, message, timestamp
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY chat_id ORDER BY id) AS seq,
+                       COUNT(*) OVER (PARTITION BY chat_id) AS total
+                FROM group_messages
+            )
+            WHERE seq > total - 100
+        """)
+        cur.execute("DROP TABLE group_messages")
+
+def _m003_promotion_clicks(cur):
+    """Move promotion followers out of the JSON column into promotion_clicks"""
+    # The primary key makes duplicate clicks a no-op
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS promotion_clicks (
+        promo_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        clicked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (promo_id, user_id),
+        FOREIGN KEY (promo_id) REFERENCES promotions (promo_id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """)
+
+    cur.execute("""
+        INSERT OR IGNORE INTO promotion_clicks (promo_id, user_id, clicked_at)
+        SELECT p.promo_id, CAST(f.value AS TEXT), p.created_at
+        FROM promotions p, json_each(p.followers) f
+        WHERE p.followers != '[]'
+    """)
+    # promotions.followers is kept (NOT NULL) but no longer used
+    cur.execute("UPDATE promotions SET followers = '[]' WHERE followers != '[]'")
+
+def _m004_user_listing_indexes(cur):
+    """Indexes for the dashboard member list (keyset paging, referral counts)"""
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at, user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_referrer ON users(referrer)")
+
+def _m005_job_applicant_count(cur):
+    """Denormalized jobs.applicant_count, kept in sync by triggers on applicants"""
+    cur.execute("ALTER TABLE jobs ADD COLUMN applicant_count INTEGER NOT NULL DEFAULT 0")
+    cur.execute("""
+        UPDATE jobs SET applicant_count = (
+            SELECT COUNT(*) FROM applicants WHERE applicants.job_id = jobs.id
+        )
+    """)
+    # INSERT OR IGNORE duplicates fire no trigger; deletes (including
+    # ON DELETE CASCADE from users) fire one per removed row
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_applicants_count_insert
+        AFTER INSERT ON applicants
+        BEGIN
+            UPDATE jobs SET applicant_count = applicant_count + 1 WHERE id = NEW.job_id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_applicants_count_delete
+        AFTER DELETE ON applicants
+        BEGIN
+            UPDATE jobs SET applicant_count = applicant_count - 1 WHERE id = OLD.job_id;
+        END
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at ON jobs(status, created_at)")
+
+def _m006_activity_rollups(cur):
+    """Hourly and daily activity counts per action_type, backfilled from activity_logs"""
+    # bucket is UTC text: 'YYYY-MM-DD HH:00:00' (hourly) or 'YYYY-MM-DD' (daily)
+    for table in ("activity_rollup_hourly", "activity_rollup_daily"):
+        cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            bucket TEXT NOT NULL,
+            action_type TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, action_type)
+        ) WITHOUT ROWID
+        """)
+
+    cur.execute("""
+        INSERT OR REPLACE INTO activity_rollup_hourly (bucket, action_type, count)
+        SELECT strftime('%Y-%m-%d %H:00:00', timestamp), action_type, COUNT(*)
+        FROM activity_logs GROUP BY 1, 2
+    """)
+    cur.execute("""
+        INSERT OR REPLACE INTO activity_rollup_daily (bucket, action_type, count)
+        SELECT date(timestamp), action_type, COUNT(*)
+        FROM activity_logs GROUP BY 1, 2
+    """)
+
+def _m007_dashboard_counters(cur):
+    """Lifetime dashboard counters, snapshotted by the dashboard and reloaded at startup"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+    """)
+
+# (version, description, function) in apply order
+MIGRATIONS = [
+    (1, "baseline schema", _m001_baseline),
+    (2, "group message ring buffer", _m002_group_message_ring),
+    (3, "promotion clicks table", _m003_promotion_clicks),
+    (4, "user listing indexes", _m004_user_listing_indexes),
+    (5, "job applicant counter", _m005_job_applicant_count),
+    (6, "activity rollup tables", _m006_activity_rollups),
+    (7, "dashboard counters table", _m007_dashboard_counters),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# ==== ENGINE ====
+
+def get_schema_version(conn):
+    """Current schema version (0 for a database without schema_version)"""
+    cur = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    )
+    if not cur.fetchone():
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def pending_migrations(conn):
+    """Migrations newer than the current schema version"""
+    current = get_schema_version(conn)
+    return [m for m in MIGRATIONS if m[0] > current]
+
+def apply_migrations(conn, target=None):
+    """Apply pending migrations up to target (default: latest). Returns applied versions."""
+    pending = pending_migrations(conn)
+    if not pending:
+        return []
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+    applied = []
+    for version, description, migrate in pending:
+        if target is not None and version > target:
+            break
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so schema changes and
+            # the version row commit together or not at all
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            migrate(cur)
+            cur.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Migration {version} ({description}) failed: {e}")
+            raise
+        logger.info(f"Applied migration {version}: {description}")
+        applied.append(version)
+    return applied
+
+# ==== CLI ====
+
+def main(argv=None):
+    """Inspect or apply migrations offline, e.g. against a copy of the database"""
+    parser = argparse.ArgumentParser(description="NexoBot schema migrations")
+    parser.add_argument("command", choices=["status", "upgrade"], help="show status or apply migrations")
+    parser.add_argument("--db", default="database.db", help="database file (default: database.db)")
+    parser.add_argument("--to", type=int, default=None, help="stop at this version")
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="apply to an in-memory copy and report, leaving the file untouched"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    if args.command == "status":
+        current = get_schema_version(conn)
+        print(f"Schema version: {current} (latest: {LATEST_VERSION})")
+        for version, description, _ in pending_migrations(conn):
+            print(f"  pending {version}: {description}")
+        conn.close()
+        return 0
+
+    if args.dry_run:
+        copy = sqlite3.connect(":memory:")
+        conn.backup(copy)
+        conn.close()
+        conn = copy
+        conn.execute("PRAGMA foreign_keys = ON")
+
+    applied = apply_migrations(conn, target=args.to)
+    print(f"Applied: {applied or 'nothing'}; schema version now {get_schema_version(conn)}")
+    if args.dry_run:
+        print("Dry run: database file not modified")
+    conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,9 @@ from datetime import datetime
 import html
 
 
-from db import (
-    get_user_by_id, add_points_to_user,
-    deduct_points, save_promotion, add_follower, get_promotion
+from async_db import (
+    get_user_by_id, get_users_by_ids, add_points_to_user,
+    deduct_points, save_promotion, add_follower, get_promotion, get_promotion_followers
 )
 from utils import GROUP_ID, PROMOTE_TOPIC_ID
 
@@ -23,7 +23,7 @@ async def promote_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
 
     # 1. Pastikan pengguna sudah terdaftar dan memiliki poin yang cukup
-    user_data = get_user_by_id(user_id)
+    user_data = await get_user_by_id(user_id)
     if not user_data:
         await update.message.reply_text("❌ Kamu harus terdaftar sebagai member untuk menggunakan fitur ini.")
         return
@@ -42,7 +42,7 @@ async def promote_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # 3. Kurangi poin dan simpan promosi ke database
-    deduct_points(user_id, 10)
+    await deduct_points(user_id, 10)
     promotion_id = str(uuid.uuid4())[:8]
 
     promotion_data = {
@@ -52,7 +52,7 @@ async def promote_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         'type': 'standar',
         'followers': []
     }
-    save_promotion(promotion_data)
+    await save_promotion(promotion_data)
 
     # Notifikasi ke user
     await update.message.reply_text(
@@ -117,7 +117,7 @@ async def promote_special_command(update: Update, context: ContextTypes.DEFAULT_
     user_id = str(update.effective_user.id)
 
     # Pastikan pengguna terdaftar dan punya poin yang cukup (15 poin)
-    user_data = get_user_by_id(user_id)
+    user_data = await get_user_by_id(user_id)
     if not user_data:
         await update.message.reply_text("❌ Kamu harus terdaftar sebagai member untuk menggunakan fitur ini.")
         return
@@ -138,7 +138,7 @@ async def promote_special_command(update: Update, context: ContextTypes.DEFAULT_
         return
 
     # Kurangi poin dan simpan promosi ke database
-    deduct_points(user_id, 15)
+    await deduct_points(user_id, 15)
     promotion_id = str(uuid.uuid4())[:8]
 
     promotion_data = {
@@ -149,7 +149,7 @@ async def promote_special_command(update: Update, context: ContextTypes.DEFAULT_
         'followers': [],
         'timestamp': datetime.now()
     }
-    save_promotion(promotion_data)
+    await save_promotion(promotion_data)
 
     # ✅ Notifikasi ke user (konfirmasi & ID promosi)
     await update.message.reply_text(
@@ -229,13 +229,13 @@ async def promote_button_handler(update: Update, context: ContextTypes.DEFAULT_T
         print(f"🔍 DEBUG: Processing promote button - promo_id: {promo_id}, user_id: {user_id}")
 
         # 1. Ambil data promosi dari database
-        promotion_data = get_promotion(promo_id)
+        promotion_data = await get_promotion(promo_id)
         if not promotion_data:
             await query.answer("❌ Promosi ini tidak ditemukan.")
             return
 
-        # 2. Periksa apakah pengguna sudah pernah mengklik
-        if user_id in promotion_data['followers']:
+        # 2. Catat klik; primary key (promo_id, user_id) menolak klik ganda secara atomik
+        if not await add_follower(promo_id, user_id):
             # Kirim DM peringatan kalau sudah pernah klik
             try:
                 await context.bot.send_message(
@@ -247,9 +247,8 @@ async def promote_button_handler(update: Update, context: ContextTypes.DEFAULT_T
             await query.answer("Anda sudah pernah mendapatkan poin dari promosi ini.")
             return
 
-        # 3. Tambah poin dan catat interaksi
-        add_points_to_user(user_id, 1)  # Reward: 1 poin per click
-        add_follower(promo_id, user_id)
+        # 3. Tambah poin
+        await add_points_to_user(user_id, 1)  # Reward: 1 poin per click
 
         # 4. Kirim notifikasi DM
         print(f"🔍 DEBUG: Mencoba mengirim DM ke user_id: {user_id}")
@@ -274,7 +273,7 @@ async def promote_button_handler(update: Update, context: ContextTypes.DEFAULT_T
             print(f"🔍 DEBUG: Link setelah diproses: {link}")
 
             # Ambil data pemilik promosi untuk ditampilkan
-            promo_owner = get_user_by_id(promotion_data['user_id'])
+            promo_owner = await get_user_by_id(promotion_data['user_id'])
             owner_username = promo_owner['username'] if promo_owner else "Unknown"
             print(f"🔍 DEBUG: Owner username: @{owner_username}")
 
@@ -357,7 +356,7 @@ async def cek_followers_command(update: Update, context: ContextTypes.DEFAULT_TY
         return
 
     # 2. Ambil data promosi dari database
-    promotion_data = get_promotion(promo_id)
+    promotion_data = await get_promotion(promo_id)
 
     if not promotion_data:
         await update.message.reply_text("❌ Promosi dengan ID tersebut tidak ditemukan.")
@@ -369,11 +368,12 @@ async def cek_followers_command(update: Update, context: ContextTypes.DEFAULT_TY
         return
 
     # 4. Ambil daftar follower dan username mereka
-    follower_ids = promotion_data['followers']
+    follower_ids = await get_promotion_followers(promo_id)
     follower_usernames = []
 
+    followers = await get_users_by_ids(follower_ids)
     for follower_id in follower_ids:
-        follower_user_data = get_user_by_id(follower_id)
+        follower_user_data = followers.get(follower_id)
         if follower_user_data:
             follower_usernames.append(f"• @{follower_user_data['username']}")
         else:
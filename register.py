@@ -2,7 +2,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     ContextTypes, ConversationHandler, MessageHandler, CallbackQueryHandler, filters, CommandHandler
 )
-from db import (
+from async_db import (
     add_user, get_user_by_id, get_user_by_username, add_points_to_user, 
     get_referrals_by_username, get_badges, add_badge_to_user, has_badge
 )
@@ -32,8 +32,8 @@ async def register_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ConversationHandler.END
 
     user_id = str(update.effective_user.id)
-    if get_user_by_id(user_id):
-        user_data = get_user_by_id(user_id)
+    if await get_user_by_id(user_id):
+        user_data = await get_user_by_id(user_id)
         await update.message.reply_text(
             f"✅ *Kamu Sudah Terdaftar!*\n\n"
             f"👤 Username: `{user_data['username']}`\n"
@@ -75,7 +75,7 @@ async def username_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Username hanya boleh mengandung huruf, angka, underscore (_), dan strip (-). Coba lagi:")
         return USERNAME
     
-    if get_user_by_username(username):
+    if await get_user_by_username(username):
         await update.message.reply_text(
             f"❌ Username `{username}` sudah dipakai member lain.\n\n"
             "Silakan pilih username lain yang unik!",
@@ -103,7 +103,7 @@ async def referral_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data['referrer'] = None
         context.user_data['referrer_user_id'] = None
     else:
-        ref_user = get_user_by_username(ref)
+        ref_user = await get_user_by_username(ref)
         if not ref_user:
             await update.message.reply_text(
                 f"❌ Username referral `{ref}` tidak ditemukan.\n\n"
@@ -239,8 +239,8 @@ async def owner_name_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Save user to database
     try:
-        add_user(user_id, context.user_data)
-        data = get_user_by_id(user_id)
+        await add_user(user_id, context.user_data)
+        data = await get_user_by_id(user_id)
         
         # Process referral if exists
         referrer_user_id = context.user_data.get('referrer_user_id')
@@ -249,14 +249,14 @@ async def owner_name_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if referrer_user_id and referrer_username:
             try:
                 # Give points to referrer
-                add_points_to_user(referrer_user_id, 25)
+                await add_points_to_user(referrer_user_id, 25)
                 
                 # Give extra welcome bonus to new user
-                add_points_to_user(user_id, 10)  # Total 25 points for referred users
+                await add_points_to_user(user_id, 10)  # Total 25 points for referred users
                 
                 # Notify referrer
                 try:
-                    referral_count = len(get_referrals_by_username(referrer_username))
+                    referral_count = len(await get_referrals_by_username(referrer_username))
                     await context.bot.send_message(
                         chat_id=referrer_user_id,
                         text=(
@@ -276,8 +276,8 @@ async def owner_name_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 logger.error(f"Failed to process referral: {e}")
 
         # Add welcome badge
-        if not has_badge(user_id, "🌟 New Member"):
-            add_badge_to_user(user_id, "🌟 New Member")
+        if not await has_badge(user_id, "🌟 New Member"):
+            await add_badge_to_user(user_id, "🌟 New Member")
 
         # Log activity
         log_activity("registration", user_id, f"New member registered: {data['username']}")
@@ -320,7 +320,7 @@ async def owner_name_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def editinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start edit info process"""
     user_id = str(update.effective_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     
     if not data:
         await update.message.reply_text(
@@ -426,14 +426,14 @@ async def edit_username_step(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await update.message.reply_text("❌ Username minimal 3 karakter. Coba lagi:")
         return EDIT_USERNAME
 
-    if get_user_by_username(new_username):
+    if await get_user_by_username(new_username):
         await update.message.reply_text("❌ Username sudah dipakai member lain. Pilih yang lain:")
         return EDIT_USERNAME
 
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     old_username = data['username']
     data['username'] = new_username
-    add_user(user_id, data)
+    await add_user(user_id, data)
 
     log_activity("edit_info", user_id, f"Username changed from {old_username} to {new_username}")
 
@@ -455,9 +455,9 @@ async def edit_whatsapp_step(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return EDIT_WHATSAPP
 
     user_id = str(update.effective_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     data['whatsapp'] = validated_phone
-    add_user(user_id, data)
+    await add_user(user_id, data)
 
     log_activity("edit_info", user_id, "WhatsApp number updated")
 
@@ -478,9 +478,9 @@ async def edit_telegram_step(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return EDIT_TELEGRAM
 
     user_id = str(update.effective_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     data['telegram'] = validated_phone
-    add_user(user_id, data)
+    await add_user(user_id, data)
 
     log_activity("edit_info", user_id, "Telegram number updated")
 
@@ -497,10 +497,10 @@ async def edit_payment_method_step(update: Update, context: ContextTypes.DEFAULT
     await query.answer()
 
     user_id = str(query.from_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     old_method = data['payment_method']
     data['payment_method'] = query.data
-    add_user(user_id, data)
+    await add_user(user_id, data)
 
     log_activity("edit_info", user_id, f"Payment method changed from {old_method} to {query.data}")
 
@@ -520,9 +520,9 @@ async def edit_payment_number_step(update: Update, context: ContextTypes.DEFAULT
         return EDIT_PAYMENT_NUMBER
 
     user_id = str(update.effective_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     data['payment_number'] = new_payment_number
-    add_user(user_id, data)
+    await add_user(user_id, data)
 
     log_activity("edit_info", user_id, "Payment number updated")
 
@@ -542,9 +542,9 @@ async def edit_owner_name_step(update: Update, context: ContextTypes.DEFAULT_TYP
         return EDIT_OWNER_NAME
 
     user_id = str(update.effective_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     data['owner_name'] = new_owner_name
-    add_user(user_id, data)
+    await add_user(user_id, data)
 
     log_activity("edit_info", user_id, "Owner name updated")
 
@@ -559,7 +559,7 @@ async def edit_owner_name_step(update: Update, context: ContextTypes.DEFAULT_TYP
 async def myinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user information"""
     user_id = str(update.effective_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
 
     if not data:
         await update.message.reply_text(
@@ -571,11 +571,11 @@ async def myinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     points = data.get('points', 0)
     referrer = data.get('referrer', 'Tidak ada')
-    badges = get_badges(user_id)
+    badges = await get_badges(user_id)
     badge_text = " | ".join(badges) if badges else "Belum ada"
 
     # Get referral statistics
-    referrals = get_referrals_by_username(data['username'])
+    referrals = await get_referrals_by_username(data['username'])
     referral_count = len(referrals)
 
     summary = (
@@ -601,7 +601,7 @@ async def myinfo_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def myreferral_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user's referral information"""
     user_id = str(update.effective_user.id)
-    data = get_user_by_id(user_id)
+    data = await get_user_by_id(user_id)
     
     if not data:
         await update.message.reply_text(
@@ -612,7 +612,7 @@ async def myreferral_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return
 
     username = data['username']
-    referrals = get_referrals_by_username(username)
+    referrals = await get_referrals_by_username(username)
     referral_count = len(referrals)
     total_referral_points = referral_count * 25
     
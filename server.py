@@ -0,0 +1,127 @@
+import logging
+import os
+import sys
+from threading import Thread
+
+logger = logging.getLogger(__name__)
+
+# One HTTP service for the dashboard and the keep-alive endpoints.
+# Both Flask apps are mounted in a single WSGI app served by waitress (a
+# production threaded server) on every port in HTTP_PORTS, so the old URLs
+# (dashboard on :5000, health checks on :8080) keep working.
+# Falls back to Werkzeug's threaded server when waitress is not installed.
+
+def _env_int(name, default):
+    """Integer setting from the environment"""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        logger.warning(f"{name} is not a valid integer, defaulting to {default}")
+        return default
+
+HTTP_HOST = os.getenv("HTTP_HOST", "0.0.0.0")
+HTTP_PORTS = [int(p) for p in os.getenv("HTTP_PORTS", "5000,8080").split(",") if p.strip()]
+HTTP_SERVER = os.getenv("HTTP_SERVER", "waitress")  # waitress | werkzeug
+HTTP_THREADS = _env_int("HTTP_THREADS", 16)                # worker threads (SSE streams hold one each)
+HTTP_CHANNEL_TIMEOUT = _env_int("HTTP_CHANNEL_TIMEOUT", 120)  # idle keep-alive / stalled request timeout, seconds
+HTTP_CONNECTION_LIMIT = _env_int("HTTP_CONNECTION_LIMIT", 200)  # open connections before new ones wait
+HTTP_BACKLOG = _env_int("HTTP_BACKLOG", 1024)
+
+# Paths served by keep_alive.app; everything else goes to the dashboard
+KEEP_ALIVE_PATHS = frozenset(["/health", "/status", "/ping", "/metrics"])
+
+def create_app():
+    """WSGI app dispatching keep-alive paths to keep_alive.app and the rest to the dashboard"""
+    from dashboard import dashboard_app
+    from keep_alive import app as keep_alive_app
+
+    def application(environ, start_response):
+        path = environ.get("PATH_INFO", "") or "/"
+        if path.rstrip("/") in KEEP_ALIVE_PATHS:
+            return keep_alive_app(environ, start_response)
+        return dashboard_app(environ, start_response)
+
+    return application
+
+def _serve_waitress(app):
+    """Serve on every HTTP_PORTS listener with waitress (blocking)"""
+    from waitress import serve
+
+    serve(
+        app,
+        listen=" ".join(f"{HTTP_HOST}:{port}" for port in HTTP_PORTS),
+        threads=HTTP_THREADS,
+        channel_timeout=HTTP_CHANNEL_TIMEOUT,
+        connection_limit=HTTP_CONNECTION_LIMIT,
+        backlog=HTTP_BACKLOG,
+        ident="NexoBot",
+    )
+
+def _serve_werkzeug(app):
+    """Serve on every HTTP_PORTS listener with Werkzeug's threaded server (blocking)"""
+    from werkzeug.serving import make_server
+
+    servers = [make_server(HTTP_HOST, port, app, threaded=True) for port in HTTP_PORTS]
+    for server in servers[1:]:
+        Thread(target=server.serve_forever, name=f"http-{server.port}", daemon=True).start()
+    servers[0].serve_forever()
+
+def run_http_server():
+    """Run the merged HTTP service (blocking)"""
+    from dashboard import SSE_MAX_CLIENTS
+
+    app = create_app()
+    backend = HTTP_SERVER
+    if backend == "waitress":
+        try:
+            import waitress  # noqa: F401
+        except ImportError:
+            logger.warning("waitress is not installed, falling back to the Werkzeug server")
+            backend = "werkzeug"
+
+    if backend == "waitress" and HTTP_THREADS <= SSE_MAX_CLIENTS:
+        logger.warning(
+            f"HTTP_THREADS={HTTP_THREADS} <= SSE_MAX_CLIENTS={SSE_MAX_CLIENTS}: "
+            f"live dashboard streams can occupy every worker"
+        )
+
+    ports = ", ".join(str(port) for port in HTTP_PORTS)
+    logger.info(f"HTTP server ({backend}, {HTTP_THREADS} threads) listening on {HTTP_HOST}:{ports}")
+    try:
+        if backend == "waitress":
+            _serve_waitress(app)
+        else:
+            _serve_werkzeug(app)
+    except Exception as e:
+        logger.error(f"HTTP server failed to start: {e}")
+        print(f"❌ HTTP server error: {e}")
+
+def start_http_server():
+    """Start the merged HTTP service in a daemon thread"""
+    from dashboard import restore_stats
+
+    restore_stats()
+    try:
+        t = Thread(target=run_http_server, name="http-server", daemon=True)
+        t.start()
+
+        logger.info("HTTP server started successfully")
+        for port in HTTP_PORTS:
+            print(f"🌐 HTTP server started on http://{HTTP_HOST}:{port}")
+        print("📊 Dashboard available at: /  (API: /api/stats, /api/users, /api/jobs, /api/analytics)")
+        print("📊 Health check available at: /health, /status, /ping, /metrics")
+
+    except Exception as e:
+        logger.error(f"Failed to start HTTP server: {e}")
+        print(f"❌ Failed to start HTTP server: {e}")
+
+if __name__ == "__main__":
+    # Dashboard + keep-alive without the bot (e.g. for benchmarks/http_rps.py)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    from db import init_db
+    from dashboard import restore_stats
+
+    init_db()
+    restore_stats()
+    run_http_server()
+    sys.exit(1)  # only reached when the server failed to start
@@ -1,6 +1,6 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from db import get_user_by_id
+from async_db import get_user_by_id
 from utils import get_user_display_name
 
 GROUP_LINK = "https://t.me/Nexo_Buzz"
@@ -61,7 +61,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_display = get_user_display_name(update.effective_user)
 
     # Check if user is registered
-    is_registered = get_user_by_id(user_id) is not None
+    is_registered = await get_user_by_id(user_id) is not None
 
     if is_registered:
         welcome_text = (
@@ -122,7 +122,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
     elif query.data == 'join_group':
-        if not get_user_by_id(user_id):
+        if not await get_user_by_id(user_id):
             await query.edit_message_text(
                 "❌ *Akses Ditolak*\n\n"
                 "Kamu harus mendaftar terlebih dahulu sebelum bisa join grup!\n\n"
@@ -163,7 +163,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
     elif query.data.startswith('member_area'):
-           user_data = get_user_by_id(user_id)
+           user_data = await get_user_by_id(user_id)
            if not user_data:
                await query.edit_message_text(
                    "❌ <b>Akses Ditolak</b>\n\n"
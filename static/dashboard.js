@@ -1,6 +1,9 @@
 // Dashboard JavaScript
 let charts = {};
 let updateInterval;
+let liveStream = null;
+let liveConnected = false;
+let liveStats = null;
 let currentTheme = localStorage.getItem('theme') || 'light';
 
 // Initialize dashboard
@@ -9,6 +12,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeCharts();
     loadInitialData();
     startAutoRefresh();
+    startLiveUpdates();
     setupEventListeners();
 });
 
@@ -150,6 +154,54 @@ function initializeCharts() {
             }
         }
     });
+
+    // Message / AI Rate Chart (per minute)
+    const rateCanvas = document.getElementById('rateChart');
+    if (rateCanvas) {
+        charts.rates = new Chart(rateCanvas.getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: [],
+                datasets: [{
+                    label: 'Messages / min',
+                    data: [],
+                    borderColor: '#6f42c1',
+                    backgroundColor: 'rgba(111, 66, 193, 0.1)',
+                    tension: 0.3,
+                    pointRadius: 0,
+                    fill: true
+                }, {
+                    label: 'AI Requests / min',
+                    data: [],
+                    borderColor: '#17a2b8',
+                    backgroundColor: 'rgba(23, 162, 184, 0.1)',
+                    tension: 0.3,
+                    pointRadius: 0,
+                    fill: true
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                animation: false,
+                plugins: {
+                    legend: {
+                        position: 'top'
+                    }
+                },
+                scales: {
+                    x: {
+                        ticks: {
+                            maxTicksLimit: 12
+                        }
+                    },
+                    y: {
+                        beginAtZero: true
+                    }
+                }
+            }
+        });
+    }
 }
 
 // Data Loading Functions
@@ -159,7 +211,8 @@ async function loadInitialData() {
         await Promise.all([
             loadStats(),
             loadActivities(),
-            loadAnalytics()
+            loadAnalytics(),
+            loadRates()
         ]);
         hideLoading();
     } catch (error) {
@@ -177,6 +230,7 @@ async function loadStats() {
             throw new Error(data.error);
         }
 
+        liveStats = data;
         updateStatsDisplay(data);
         updateSystemStatus(data);
 
@@ -218,6 +272,26 @@ async function loadAnalytics() {
     }
 }
 
+async function loadRates() {
+    if (!charts.rates) return;
+    try {
+        const response = await fetch('/api/rates');
+        const data = await response.json();
+
+        if (data.error) {
+            throw new Error(data.error);
+        }
+
+        charts.rates.data.labels = data.labels;
+        charts.rates.data.datasets[0].data = data.messages;
+        charts.rates.data.datasets[1].data = data.ai_requests;
+        charts.rates.update();
+
+    } catch (error) {
+        console.error('Error loading rates:', error);
+    }
+}
+
 // Display Update Functions
 function updateStatsDisplay(data) {
     // Update stat cards
@@ -247,6 +321,14 @@ function updateSystemStatus(data) {
     updateStatusElement('gemini-api-status', envStatus.gemini_api);
     updateStatusElement('owner-id-status', envStatus.owner_id);
 
+    // Update user cache hit rate
+    const userCacheElement = document.getElementById('user-cache-status');
+    if (userCacheElement && data.user_cache) {
+        const cache = data.user_cache;
+        const hitRate = (cache.hit_rate * 100).toFixed(1);
+        userCacheElement.textContent = `${hitRate}% hit (${cache.hits}/${cache.hits + cache.misses}), ${cache.size} cached`;
+    }
+
     // Update last activity
     const lastActivityElement = document.getElementById('last-activity');
     if (lastActivityElement) {
@@ -317,10 +399,20 @@ async function showUserModal() {
     await loadUsers();
 }
 
+// Keyset cursors per page of the current user search (page -> cursor)
+let userCursors = {};
+let userCursorSearch = '';
+
 async function loadUsers(page = 1, search = '') {
     try {
+        if (search !== userCursorSearch) {
+            userCursors = {};
+            userCursorSearch = search;
+        }
+
         const params = new URLSearchParams({ page, limit: 20 });
         if (search) params.append('search', search);
+        if (userCursors[page]) params.append('cursor', userCursors[page]);
 
         const response = await fetch(`/api/users?${params}`);
         const data = await response.json();
@@ -329,6 +421,10 @@ async function loadUsers(page = 1, search = '') {
             throw new Error(data.error);
         }
 
+        if (data.next_cursor) {
+            userCursors[page + 1] = data.next_cursor;
+        }
+
         updateUsersTable(data);
 
     } catch (error) {
@@ -600,18 +696,79 @@ function changePage(page) {
     }
 }
 
-// Auto Refresh
+// Auto Refresh (fallback while the live stream is not connected)
 function startAutoRefresh() {
     updateInterval = setInterval(() => {
+        if (liveConnected) return;
         loadStats();
         loadActivities();
     }, 30000); // Refresh every 30 seconds
+
+    // Rate buckets are per minute and not pushed over the live stream
+    setInterval(loadRates, 60000);
+}
+
+// Live Updates (Server-Sent Events)
+function startLiveUpdates() {
+    if (!window.EventSource) return; // polling only
+
+    liveStream = new EventSource('/api/stream');
+
+    liveStream.onopen = () => {
+        liveConnected = true;
+        // Catch up on anything missed while disconnected
+        loadStats();
+    };
+
+    liveStream.onerror = () => {
+        // EventSource reconnects on its own; poll until it does
+        liveConnected = false;
+    };
+
+    liveStream.addEventListener('counters', (e) => applyLiveDelta(JSON.parse(e.data)));
+    liveStream.addEventListener('totals', (e) => applyLiveDelta(JSON.parse(e.data)));
+    liveStream.addEventListener('ping', (e) => applyLiveDelta(JSON.parse(e.data)));
+
+    liveStream.addEventListener('activity', (e) => {
+        if (!liveStats) return;
+        const activity = JSON.parse(e.data);
+        liveStats.recent_activities = [activity, ...(liveStats.recent_activities || [])].slice(0, 20);
+        renderLiveStats();
+    });
+
+    liveStream.addEventListener('resync', () => {
+        loadStats();
+    });
+}
+
+function applyLiveDelta(delta) {
+    if (!liveStats) return;
+    Object.assign(liveStats, delta);
+    renderLiveStats();
+}
+
+function renderLiveStats() {
+    lastUpdateTime = Date.now();
+    updateStatsDisplay(liveStats);
+    updateSystemStatus(liveStats);
+    updateActivitiesDisplay(liveStats.recent_activities || []);
+    if (liveStats.job_status_distribution) {
+        updateChartsData({ job_status_distribution: liveStats.job_status_distribution });
+    }
+    try {
+        updateDashboard(liveStats);
+    } catch (error) {
+        console.error('Error rendering live update:', error);
+    }
 }
 
 function stopAutoRefresh() {
     if (updateInterval) {
         clearInterval(updateInterval);
     }
+    if (liveStream) {
+        liveStream.close();
+    }
 }
 
 // UI Helper Functions
@@ -643,6 +800,7 @@ async function fetchStats() {
     try {
         const response = await fetch('/api/stats');
         const data = await response.json();
+        liveStats = data;
         updateDashboard(data);
         lastUpdateTime = Date.now();
     } catch (error) {
@@ -689,6 +847,10 @@ function updateDashboard(data) {
             <span>🎯 Promotions</span>
             <span>${data.total_promotions || 0}</span>
         </div>
+        <div class="stat-item">
+            <span>🗄️ User Cache Hit Rate</span>
+            <span>${((data.user_cache?.hit_rate || 0) * 100).toFixed(1)}%</span>
+        </div>
         <div class="stat-item">
             <span>🏆 Top User</span>
             <span>@${data.top_user?.username || 'N/A'} (${data.top_user?.points || 0} pts)</span>
@@ -760,12 +922,15 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log('Dashboard initializing...');
     fetchStats();
     
-    // Auto-refresh every 10 seconds
-    setInterval(fetchStats, 10000);
+    // Auto-refresh every 10 seconds, only while the live stream is down
+    setInterval(() => {
+        if (!liveConnected) fetchStats();
+    }, 10000);
     
     // Update connection status
     const statusElement = document.getElementById('status');
     setInterval(() => {
+        // Live pings arrive every 15s, so 30s of silence means the stream is gone too
         const timeSinceUpdate = Date.now() - lastUpdateTime;
         if (timeSinceUpdate > 30000) { // 30 seconds
             statusElement.innerHTML = '<span class="dot offline"></span> Connection Lost';